@@ -0,0 +1,337 @@
+"""Measure the throughput and latency of the controller stack against a simulator.
+
+For each combination of process count and tree size, an ``OdinSimulator`` is run in a
+subprocess and an ``OdinTopController`` is created for it and polled as the FastCS
+scan tasks would. The results are printed and can be saved as JSON and compared with
+the results of a previous run, e.g. of the last release.
+
+    python benchmarks/controller_stack.py --processes 1 --processes 16 \\
+        --extra-parameters 0 --extra-parameters 100 --output results.json
+
+Reported for each run:
+
+- startup_time: Time to introspect the server and create the controllers (s)
+- walk_time: Time to create parameters from all of the adapter trees (s)
+- polls_per_second: Attribute polls completed per second, polling continuously
+- update_latency_p50/max: Time from a write by another client to the attribute
+  being updated, polling at the update period (s)
+- cpu_per_1k_parameters: CPU used per 1000 parameters polling at the update
+  period (%)
+- rss: Peak resident set size of the process running the configuration, excluding
+  the simulator (MiB)
+
+Each configuration is run in a new process, so that its peak RSS is not that of an
+earlier, larger configuration.
+
+"""
+
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import platform
+import resource
+import socket
+import statistics
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+from fastcs.attributes import AttrR
+
+from odin_fastcs import __version__
+from odin_fastcs.http_connection import HTTPConnection, HTTPConnectionSettings
+from odin_fastcs.odin_controller import (
+    REQUEST_METADATA_HEADER,
+    OdinController,
+    OdinTopController,
+    ParamTreeHandler,
+)
+from odin_fastcs.simulator import SimulatorSettings, run_simulator
+from odin_fastcs.util import create_odin_parameters
+
+UPDATE_PERIOD = ParamTreeHandler.update_period
+
+
+@dataclass
+class BenchmarkResult:
+    processes: int
+    extra_parameters: int
+    parameters: int
+    startup_time: float
+    walk_time: float
+    polls_per_second: float
+    update_latency_p50: float
+    update_latency_max: float
+    cpu_per_1k_parameters: float
+    rss: float
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_simulator(settings: SimulatorSettings) -> tuple[multiprocessing.Process, int]:
+    port = free_port()
+    process = multiprocessing.Process(
+        target=run_simulator, args=(settings, "127.0.0.1", port), daemon=True
+    )
+    process.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.05)
+
+    process.terminate()
+    raise TimeoutError("Simulator did not start")
+
+
+def get_attributes(
+    controller: OdinTopController,
+) -> list[tuple[OdinController, AttrR[Any]]]:
+    return [
+        (sub_controller, attr)
+        for sub_controller in controller.get_sub_controllers()
+        if isinstance(sub_controller, OdinController)
+        for attr in vars(sub_controller).values()
+        if isinstance(attr, AttrR) and attr.updater is not None
+    ]
+
+
+async def poll(attributes: list[tuple[OdinController, AttrR[Any]]]):
+    # Update all attributes concurrently, as the FastCS scan tasks do
+    await asyncio.gather(
+        *[attr.updater.update(controller, attr) for controller, attr in attributes]  # type: ignore
+    )
+
+
+async def measure_polls_per_second(
+    attributes: list[tuple[OdinController, AttrR[Any]]], duration: float
+) -> float:
+    polls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        await poll(attributes)
+        polls += len(attributes)
+
+    return polls / (time.perf_counter() - start)
+
+
+async def measure_polling(
+    attributes: list[tuple[OdinController, AttrR[Any]]],
+    port: int,
+    processes: int,
+    duration: float,
+    samples: int,
+) -> tuple[list[float], float]:
+    """Poll at the update period, measuring update latency and CPU usage."""
+
+    async def scan():
+        while True:
+            await poll(attributes)
+            await asyncio.sleep(UPDATE_PERIOD)
+
+    process = str(processes - 1)
+    _, attr = next(
+        (controller, attr)
+        for controller, attr in attributes
+        if controller.path == [f"FP{process}"] and attr is controller.config_hdf_frames  # type: ignore
+    )
+    client = HTTPConnection("127.0.0.1", port)
+    client.open()
+
+    scan_task = asyncio.create_task(scan())
+    cpu_start, start = time.process_time(), time.perf_counter()
+
+    latencies = []
+    for value in range(1, samples + 1):
+        await asyncio.sleep(duration / samples)
+        write_time = time.perf_counter()
+        await client.put(f"api/0.1/fp/{process}/config/hdf/frames", value)
+        while attr.get() != value:
+            await asyncio.sleep(0.001)
+        latencies.append(time.perf_counter() - write_time)
+
+    cpu = (time.process_time() - cpu_start) / (time.perf_counter() - start)
+    scan_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await scan_task
+    await client.close()
+    return latencies, cpu
+
+
+async def measure_walk_time(port: int) -> tuple[float, int]:
+    connection = HTTPConnection("127.0.0.1", port)
+    connection.open()
+    adapters = (await connection.get("api/0.1/adapters"))["adapters"]
+    trees = [
+        await connection.get(f"api/0.1/{adapter}", headers=REQUEST_METADATA_HEADER)
+        for adapter in adapters  # type: ignore
+    ]
+    await connection.close()
+
+    parameters = sum(len(create_odin_parameters(tree)) for tree in trees)
+    repeat = 10
+    walk_time = timeit.timeit(
+        lambda: [create_odin_parameters(tree) for tree in trees], number=repeat
+    )
+    return walk_time / repeat, parameters
+
+
+def run_benchmark(
+    processes: int,
+    extra_parameters: int,
+    batch_poll: bool,
+    template_indices: bool,
+    duration: float,
+) -> BenchmarkResult:
+    simulator, port = start_simulator(
+        SimulatorSettings(processes=processes, extra_parameters=extra_parameters)
+    )
+    try:
+        walk_time, parameters = asyncio.run(measure_walk_time(port))
+
+        start = time.perf_counter()
+        controller = OdinTopController(
+            HTTPConnectionSettings("127.0.0.1", port),
+            batch_poll=batch_poll,
+            template_indices=template_indices,
+        )
+        startup_time = time.perf_counter() - start
+
+        async def measure():
+            await controller.connect()
+            attributes = get_attributes(controller)
+            polls_per_second = await measure_polls_per_second(attributes, duration)
+            latencies, cpu = await measure_polling(
+                attributes, port, processes, duration, samples=10
+            )
+            await controller._connection.close()
+            return polls_per_second, latencies, cpu
+
+        polls_per_second, latencies, cpu = asyncio.run(measure())
+    finally:
+        simulator.terminate()
+        simulator.join()
+
+    return BenchmarkResult(
+        processes=processes,
+        extra_parameters=extra_parameters,
+        parameters=parameters,
+        startup_time=startup_time,
+        walk_time=walk_time,
+        polls_per_second=polls_per_second,
+        update_latency_p50=statistics.median(latencies),
+        update_latency_max=max(latencies),
+        cpu_per_1k_parameters=100 * cpu / (parameters / 1000),
+        rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    )
+
+
+def run_benchmark_in_subprocess(
+    processes: int,
+    extra_parameters: int,
+    batch_poll: bool,
+    template_indices: bool,
+    duration: float,
+) -> BenchmarkResult:
+    """Run a benchmark in a new process, so that the peak RSS measured is its own."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(
+            run_benchmark,
+            processes,
+            extra_parameters,
+            batch_poll,
+            template_indices,
+            duration,
+        ).result()
+
+
+def compare(results: list[BenchmarkResult], baseline_path: Path):
+    baseline = {
+        (r["processes"], r["extra_parameters"]): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+    print(f"\nChange from {baseline_path}:")
+    for result in results:
+        base = baseline.get((result.processes, result.extra_parameters))
+        if base is None:
+            continue
+
+        changes = ", ".join(
+            f"{name} {100 * (value / base[name] - 1):+.1f}%"
+            for name, value in asdict(result).items()
+            if name not in ("processes", "extra_parameters", "parameters")
+            and base[name]
+        )
+        print(f"{result.processes:>4} x {result.extra_parameters:<5} {changes}")
+
+
+def main(
+    processes: Annotated[
+        list[int], typer.Option(help="Number of processes per adapter")
+    ] = [1, 16],  # noqa: B006
+    extra_parameters: Annotated[
+        list[int], typer.Option(help="Synthetic parameters to add to each process")
+    ] = [0],  # noqa: B006
+    batch_poll: Annotated[bool, typer.Option(help="Poll subtrees in batches")] = False,
+    template_indices: Annotated[
+        bool, typer.Option(help="Share parameters of identical process subtrees")
+    ] = False,
+    duration: Annotated[float, typer.Option(help="Seconds to poll for")] = 5.0,
+    output: Annotated[Path | None, typer.Option(help="File to save results to")] = None,
+    baseline: Annotated[
+        Path | None, typer.Option(help="Results file to compare with")
+    ] = None,
+):
+    results = []
+    for process_count in processes:
+        for extra in extra_parameters:
+            result = run_benchmark_in_subprocess(
+                process_count, extra, batch_poll, template_indices, duration
+            )
+            results.append(result)
+            print(
+                f"{process_count:>4} processes, {result.parameters} parameters: "
+                f"startup {result.startup_time:.3f} s, walk {result.walk_time:.4f} s, "
+                f"{result.polls_per_second:.0f} polls/s, "
+                f"latency p50 {result.update_latency_p50:.3f} s "
+                f"max {result.update_latency_max:.3f} s, "
+                f"CPU {result.cpu_per_1k_parameters:.1f} %/1k parameters, "
+                f"RSS {result.rss:.0f} MiB"
+            )
+
+    if output is not None:
+        output.write_text(
+            json.dumps(
+                {
+                    "version": __version__,
+                    "python": platform.python_version(),
+                    "date": datetime.now().isoformat(),
+                    "batch_poll": batch_poll,
+                    "template_indices": template_indices,
+                    "duration": duration,
+                    "results": [asdict(result) for result in results],
+                },
+                indent=2,
+            )
+        )
+
+    if baseline is not None:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,48 @@
+"""Compare the time to decode and encode Odin responses with each JSON codec.
+
+Decodes the adapter tree packaged with the simulator, replicated for a configurable
+number of processes, as an adapter metadata response or batched poll response would
+be.
+
+    python benchmarks/json_codec.py --processes 16
+
+"""
+
+import json
+import timeit
+from functools import partial
+from typing import Annotated
+
+import typer
+
+from odin_fastcs.json_codec import JSON_CODECS
+from odin_fastcs.simulator import load_adapter_template
+
+
+def main(
+    processes: Annotated[int, typer.Option(help="Number of FP processes")] = 16,
+    repeat: Annotated[int, typer.Option(help="Number of iterations")] = 100,
+):
+    response = load_adapter_template()
+    process_tree = response.pop("0")
+    for idx in range(processes):
+        response[str(idx)] = process_tree
+
+    payload = json.dumps(response).encode()
+    print(f"{len(payload) / 1024:.1f} KiB payload, {repeat} iterations")
+
+    for name, codec_cls in JSON_CODECS.items():
+        try:
+            codec = codec_cls()
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+
+        assert codec.loads(payload) == response
+        loads = timeit.timeit(partial(codec.loads, payload), number=repeat) / repeat
+        dumps = timeit.timeit(partial(codec.dumps, response), number=repeat) / repeat
+        print(f"{name:>8}: loads {loads * 1e6:8.1f} us, dumps {dumps * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    typer.run(main)
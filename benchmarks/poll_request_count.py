@@ -0,0 +1,102 @@
+"""Compare the number of requests sent per poll in individual and batched modes.
+
+Builds the controllers for an ``fp`` adapter with a configurable number of processes
+from the adapter tree packaged with the simulator and runs one poll of every attribute
+against an in-process stand-in for the Odin server.
+
+    python benchmarks/poll_request_count.py --processes 16
+
+"""
+
+import asyncio
+import copy
+import time
+from typing import Annotated, Any
+
+import typer
+from fastcs.attributes import AttrR
+
+from odin_fastcs.odin_controller import OdinController
+from odin_fastcs.simulator import load_adapter_template, strip_metadata
+from odin_fastcs.util import get_uri_value
+
+API_PREFIX = "api/0.1/fp"
+
+
+class CountingConnection:
+    """Serve GET requests from a static parameter tree and count them."""
+
+    def __init__(self, tree: dict[str, Any]):
+        self.tree = strip_metadata(tree)
+        self.requests = 0
+
+    async def get(self, uri: str, headers: dict | None = None) -> dict[str, Any]:
+        self.requests += 1
+        path = uri.removeprefix(API_PREFIX).strip("/").split("/")
+        if path == [""]:
+            return self.tree
+
+        return {path[-1]: get_uri_value(self.tree, path)}
+
+
+def create_response(processes: int) -> dict[str, Any]:
+    response = load_adapter_template()
+    process_tree = response.pop("0")
+    for idx in range(processes):
+        response[str(idx)] = copy.deepcopy(process_tree)
+
+    return response
+
+
+async def poll_once(response: dict[str, Any], batch: bool) -> tuple[int, int, float]:
+    connection = CountingConnection(response)
+    controllers = [
+        OdinController(
+            connection,  # type: ignore
+            {k: v for k, v in response.items() if not k.isdigit()},
+            API_PREFIX,
+            ["FP"],
+            batch_depth=1 if batch else None,
+        )
+    ] + [
+        OdinController(
+            connection,  # type: ignore
+            tree,
+            f"{API_PREFIX}/{idx}",
+            [f"FP{idx}"],
+            batch_depth=0 if batch else None,
+        )
+        for idx, tree in response.items()
+        if idx.isdigit()
+    ]
+    for controller in controllers:
+        await controller._create_parameter_tree()
+
+    # Update all attributes concurrently, as the FastCS scan tasks do
+    updates = [
+        attr.updater.update(controller, attr)  # type: ignore
+        for controller in controllers
+        for attr in vars(controller).values()
+        if isinstance(attr, AttrR) and attr.updater is not None
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*updates)
+    return len(updates), connection.requests, time.perf_counter() - start
+
+
+def main(
+    processes: Annotated[int, typer.Option(help="Number of FP processes")] = 16,
+    update_period: Annotated[float, typer.Option(help="Poll period in seconds")] = 0.2,
+):
+    response = create_response(processes)
+    print(f"{processes} processes, {update_period} s update period")
+    for mode, batch in (("individual", False), ("batched", True)):
+        attributes, requests, duration = asyncio.run(poll_once(response, batch))
+        print(
+            f"{mode:>10}: {attributes} attributes, {requests} requests per poll, "
+            f"{requests / update_period:.0f} requests/s, poll took {duration:.4f} s"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,18 +1,21 @@
+import functools
+import inspect
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Annotated, Any, Optional
 
 import typer
-from fastcs.backends.asyncio_backend import AsyncioBackend
-from fastcs.backends.epics.gui import EpicsGUIOptions
-from fastcs.connections.ip_connection import IPConnectionSettings
-from fastcs.mapping import Mapping
-
-from odin_fastcs.odin_controller import (
-    OdinTopController,
-)
 
 from . import __version__
 
+if TYPE_CHECKING:
+    from fastcs.connections.ip_connection import IPConnectionSettings
+    from fastcs.mapping import Mapping
+
+    from odin_fastcs.http_connection import HTTPConnectionSettings
+
 __all__ = ["main"]
 
 
@@ -40,31 +43,401 @@ def main(
     pass
 
 
+BackgroundGui = Annotated[
+    bool,
+    typer.Option(
+        "--background-gui",
+        help="Create odin.bob in the background while the IOC starts, if it is "
+        "outdated",
+    ),
+]
+
+# Options of the controllers, shared by the commands that create them
+BatchPoll = Annotated[
+    bool,
+    typer.Option("--batch-poll", help="Poll each Odin subtree with a single request"),
+]
+IntrospectionConcurrency = Annotated[
+    int, typer.Option(help="Maximum number of adapters to introspect at once")
+]
+CacheDir = Annotated[
+    Optional[Path],  # noqa
+    typer.Option(
+        help="Directory to cache adapter parameter trees in for fast restarts"
+    ),
+]
+HeartbeatPeriod = Annotated[
+    Optional[float],  # noqa
+    typer.Option(help="Seconds between republishing unchanged values, default never"),
+]
+WriteWindow = Annotated[
+    Optional[float],  # noqa
+    typer.Option(help="Seconds to collect writes for and merge into one request"),
+]
+MaxUpdatePeriod = Annotated[
+    Optional[float],  # noqa
+    typer.Option(
+        help="Slow polling of unchanging parameters down to this period in seconds"
+    ),
+]
+PollingProfiles = Annotated[
+    Optional[Path],  # noqa
+    typer.Option(
+        help="TOML file of polling profiles to switch between by parameter values"
+    ),
+]
+ScheduledPolling = Annotated[
+    bool,
+    typer.Option(
+        "--scheduled-polling",
+        help="Spread polls evenly across the update period, with status first",
+    ),
+]
+PollBudget = Annotated[
+    Optional[float],  # noqa
+    typer.Option(help="Maximum polls per second with --scheduled-polling"),
+]
+TemplateIndices = Annotated[
+    bool,
+    typer.Option(
+        "--template-indices",
+        help="Create parameters of identical process subtrees once and share them",
+    ),
+]
+Aggregates = Annotated[
+    Optional[list[str]],  # noqa
+    typer.Option(
+        "--aggregate",
+        help="Aggregate of indexed process parameters to add to each adapter, "
+        "declared as '<pattern> -> <function>', e.g. "
+        "'*/status/hdf/frames_written -> sum'",
+    ),
+]
+IdlePeriod = Annotated[
+    Optional[float],  # noqa
+    typer.Option(
+        help="Poll parameters at this period in seconds unless demanded by writing "
+        "patterns such as 'fp/*/status/hdf/*' to DemandParameters"
+    ),
+]
+PollWorkers = Annotated[
+    int,
+    typer.Option(
+        help="Worker processes to poll and decode parameter trees in, 0 for none"
+    ),
+]
+Servers = Annotated[
+    Optional[list[str]],  # noqa
+    typer.Option(
+        "--server",
+        help="Odin server to connect to as PREFIX=HOST:PORT, with its controllers "
+        "under PREFIX. Give once per server to run several in one IOC. Defaults to "
+        "127.0.0.1:8888 without a prefix.",
+    ),
+]
+
+# Options of the connection to each Odin server
+PoolSize = Annotated[int, typer.Option(help="Maximum open connections, 0 for no limit")]
+PoolSizePerHost = Annotated[
+    int, typer.Option(help="Maximum open connections per endpoint, 0 for no limit")
+]
+KeepaliveTimeout = Annotated[
+    float, typer.Option(help="Seconds to keep idle connections open for reuse")
+]
+ConnectTimeout = Annotated[
+    float,
+    typer.Option(
+        help="Seconds to wait for a connection from the pool, 0 for no timeout"
+    ),
+]
+ReadTimeout = Annotated[
+    float,
+    typer.Option(help="Seconds to wait for each response read, 0 for no timeout"),
+]
+RequestTimeout = Annotated[
+    float,
+    typer.Option(help="Seconds to wait for a whole request, 0 for no timeout"),
+]
+MaxInFlight = Annotated[
+    int,
+    typer.Option(help="Maximum requests awaiting a response at once, 0 for no limit"),
+]
+JsonCodec = Annotated[
+    Optional[str],  # noqa
+    typer.Option(help="JSON codec for payloads, defaults to the fastest installed"),
+]
+FailureThreshold = Annotated[
+    int,
+    typer.Option(
+        help="Consecutive failed requests to stop polling after, 0 to never stop"
+    ),
+]
+BackoffInitial = Annotated[
+    float,
+    typer.Option(help="Seconds to wait before the first reconnect attempt"),
+]
+BackoffMax = Annotated[
+    float, typer.Option(help="Longest seconds to wait between reconnect attempts")
+]
+
+
+@dataclass
+class ControllerOptions:
+    """Options for the controllers of each Odin server, from the command line.
+
+    See ``OdinTopController`` for the meaning of each option.
+
+    """
+
+    batch_poll: bool = False
+    introspection_concurrency: int = 8
+    cache_dir: Path | None = None
+    heartbeat_period: float | None = None
+    write_window: float | None = None
+    max_update_period: float | None = None
+    polling_profiles: Path | None = None
+    """TOML file of polling profiles."""
+    scheduled_polling: bool = False
+    poll_budget: float | None = None
+    template_indices: bool = False
+    aggregates: list[str] | None = None
+    """Aggregates declared as ``<pattern> -> <function>``."""
+    idle_period: float | None = None
+    poll_workers: int = 0
+
+    def controller_kwargs(self) -> dict[str, Any]:
+        """Get the keyword arguments of ``OdinTopController`` for the options.
+
+        Raises:
+            ValueError if the polling profiles or aggregates are invalid
+
+        """
+        from odin_fastcs.aggregates import parse_aggregate
+        from odin_fastcs.profiles import load_polling_profiles
+
+        kwargs = {f.name: getattr(self, f.name) for f in fields(self)}
+        kwargs["polling_profiles"] = (
+            load_polling_profiles(self.polling_profiles)
+            if self.polling_profiles is not None
+            else None
+        )
+        kwargs["aggregates"] = [parse_aggregate(a) for a in self.aggregates or []]
+        return kwargs
+
+
+def _connection_settings(
+    pool_size: int,
+    pool_size_per_host: int,
+    keepalive_timeout: float,
+    connect_timeout: float,
+    read_timeout: float,
+    request_timeout: float,
+    max_in_flight: int,
+    json_codec: str | None,
+    failure_threshold: int,
+    backoff_initial: float,
+    backoff_max: float,
+) -> "HTTPConnectionSettings":
+    """Create the settings of the connection to the default Odin server.
+
+    Timeouts of ``0`` are disabled.
+
+    """
+    from odin_fastcs.http_connection import HTTPConnectionSettings
+
+    return HTTPConnectionSettings(
+        "127.0.0.1",
+        8888,
+        pool_size=pool_size,
+        pool_size_per_host=pool_size_per_host,
+        keepalive_timeout=keepalive_timeout,
+        connect_timeout=connect_timeout or None,
+        read_timeout=read_timeout or None,
+        request_timeout=request_timeout or None,
+        max_in_flight=max_in_flight,
+        json_codec=json_codec,
+        failure_threshold=failure_threshold,
+        backoff_initial=backoff_initial,
+        backoff_max=backoff_max,
+    )
+
+
+def _controller_options(
+    batch_poll: BatchPoll = False,
+    introspection_concurrency: IntrospectionConcurrency = 8,
+    cache_dir: CacheDir = None,
+    heartbeat_period: HeartbeatPeriod = None,
+    write_window: WriteWindow = None,
+    max_update_period: MaxUpdatePeriod = None,
+    polling_profiles: PollingProfiles = None,
+    scheduled_polling: ScheduledPolling = False,
+    poll_budget: PollBudget = None,
+    template_indices: TemplateIndices = False,
+    aggregates: Aggregates = None,
+    idle_period: IdlePeriod = None,
+    poll_workers: PollWorkers = 0,
+    server: Servers = None,
+    pool_size: PoolSize = 100,
+    pool_size_per_host: PoolSizePerHost = 0,
+    keepalive_timeout: KeepaliveTimeout = 15.0,
+    connect_timeout: ConnectTimeout = 2.0,
+    read_timeout: ReadTimeout = 5.0,
+    request_timeout: RequestTimeout = 10.0,
+    max_in_flight: MaxInFlight = 0,
+    json_codec: JsonCodec = None,
+    failure_threshold: FailureThreshold = 5,
+    backoff_initial: BackoffInitial = 0.5,
+    backoff_max: BackoffMax = 30.0,
+) -> None:
+    """Declare the options of the commands that create controllers.
+
+    Each option is a field of ``ControllerOptions``, an argument of
+    ``_connection_settings`` or ``server``. See ``controller_command``.
+
+    """
+
+
+def controller_command(command: Callable[..., None]) -> Callable[..., None]:
+    """Add the options of ``_controller_options`` to a command.
+
+    The controllers are created from the options and their mapping is passed to
+    ``command`` as ``mapping``, with the remaining arguments of the command line.
+
+    """
+    connection_options = inspect.signature(_connection_settings).parameters
+    controller_options = [option.name for option in fields(ControllerOptions)]
+
+    @functools.wraps(command)
+    def wrapper(**kwargs: Any) -> None:
+        settings = _connection_settings(
+            **{name: kwargs.pop(name) for name in connection_options}
+        )
+        options = ControllerOptions(
+            **{name: kwargs.pop(name) for name in controller_options}
+        )
+        mapping = get_controller_mapping(settings, options, kwargs.pop("server"))
+        command(mapping, **kwargs)
+
+    parameters = [
+        *list(inspect.signature(command).parameters.values())[1:],
+        *inspect.signature(_controller_options).parameters.values(),
+    ]
+    wrapper.__signature__ = inspect.Signature(parameters)  # type: ignore
+    wrapper.__annotations__ = {p.name: p.annotation for p in parameters}
+    return wrapper
+
+
 @app.command()
-def ioc(pv_prefix: str = typer.Argument()):
+@controller_command
+def ioc(
+    mapping: "Mapping",
+    pv_prefix: str = typer.Argument(),
+    background_gui: BackgroundGui = False,
+):
     from fastcs.backends.epics.backend import EpicsBackend
 
-    mapping = get_controller_mapping()
+    from odin_fastcs.gui import create_gui
 
     backend = EpicsBackend(mapping, pv_prefix)
-    backend.create_gui(options=EpicsGUIOptions(output_path=Path.cwd() / "odin.bob"))
+    create_gui(
+        backend, mapping, pv_prefix, Path.cwd() / "odin.bob", background=background_gui
+    )
     backend.get_ioc().run()
 
 
 @app.command()
-def asyncio():
-    mapping = get_controller_mapping()
+@controller_command
+def asyncio(mapping: "Mapping"):
+    from fastcs.backends.asyncio_backend import AsyncioBackend
 
     backend = AsyncioBackend(mapping)
     backend.run_interactive_session()
 
 
-def get_controller_mapping() -> Mapping:
-    controller = OdinTopController(IPConnectionSettings("127.0.0.1", 8888))
+@app.command()
+def simulate(
+    processes: int = typer.Option(1, help="Number of processes under each adapter"),
+    port: int = typer.Option(8888, help="Port to serve on"),
+    extra_parameters: int = typer.Option(
+        0, help="Synthetic status parameters to add to each process"
+    ),
+    latency: float = typer.Option(0.0, help="Seconds to delay each response by"),
+    jitter: float = typer.Option(0.0, help="Maximum random seconds to add to latency"),
+    error_rate: float = typer.Option(
+        0.0, help="Fraction of requests to fail with an internal server error"
+    ),
+):
+    """Run a simulated Odin server with odin-data adapters."""
+    from odin_fastcs.simulator import SimulatorSettings, run_simulator
+
+    logging.basicConfig(level=logging.INFO)
+    run_simulator(
+        SimulatorSettings(
+            processes=processes,
+            extra_parameters=extra_parameters,
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+        ),
+        port=port,
+    )
+
+
+def get_controller_mapping(
+    settings: "IPConnectionSettings | None" = None,
+    options: ControllerOptions | None = None,
+    servers: list[str] | None = None,
+) -> "Mapping":
+    """Create the controllers of the Odin servers and map them.
+
+    Args:
+        settings: Settings of the connection to the server. If ``servers`` are given,
+            these are copied for each server, with its host and port.
+        options: Options of the controllers of each server
+        servers: Servers to connect to as ``PREFIX=HOST:PORT``, or ``None`` to
+            connect to the server in ``settings`` without a prefix
+
+    """
+    from fastcs.connections.ip_connection import IPConnectionSettings
+    from fastcs.controller import Controller
+    from fastcs.mapping import Mapping
+
+    from odin_fastcs.odin_controller import OdinServersController, OdinTopController
+
+    settings = settings or IPConnectionSettings("127.0.0.1", 8888)
+    kwargs = (options or ControllerOptions()).controller_kwargs()
+
+    controller: Controller
+    if servers:
+        controller = OdinServersController(
+            dict(parse_server(server, settings) for server in servers), **kwargs
+        )
+    else:
+        controller = OdinTopController(settings, **kwargs)
 
     return Mapping(controller)
 
 
+def parse_server(
+    server: str, settings: "IPConnectionSettings"
+) -> "tuple[str, IPConnectionSettings]":
+    """Parse a server given as ``PREFIX=HOST:PORT``.
+
+    Args:
+        server: Server to parse
+        settings: Settings to copy for the server, with its host and port
+
+    Returns: Prefix and settings of server
+
+    """
+    prefix, _, address = server.rpartition("=")
+    host, _, port = address.rpartition(":")
+    if not prefix or not host or not port.isdigit():
+        raise typer.BadParameter(f"Expected PREFIX=HOST:PORT, got {server!r}")
+
+    return prefix, replace(settings, ip=host, port=int(port))
+
+
 # test with: python -m odin_fastcs
 if __name__ == "__main__":
     app()
@@ -0,0 +1,201 @@
+import logging
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+from fastcs.attributes import AttrR
+from fastcs.datatypes import Bool, DataType, Float, Int
+
+if TYPE_CHECKING:
+    from odin_fastcs.odin_controller import OdinController
+
+AGGREGATE_FUNCTIONS: dict[str, np.ufunc] = {
+    "sum": np.add,
+    "mean": np.add,
+    "min": np.minimum,
+    "max": np.maximum,
+    "any": np.logical_or,
+    "all": np.logical_and,
+}
+"""Reduction of each aggregate function, ``mean`` being divided by the count."""
+
+
+@dataclass(frozen=True)
+class Aggregate:
+    """Attribute of an adapter aggregating a parameter of its indexed processes."""
+
+    pattern: str
+    """``fnmatch`` pattern of parameter URIs within the adapter tree, e.g.
+    ``*/status/hdf/frames_written`` for the frames written by every process."""
+    function: str
+    """Name of the function to aggregate with, one of ``AGGREGATE_FUNCTIONS``."""
+
+    @property
+    def name(self) -> str:
+        """Name of the attribute, from the literal nodes of the pattern."""
+        nodes = [node for node in self.pattern.split("/") if not _is_wildcard(node)]
+        return "_".join(nodes + [self.function])
+
+
+def parse_aggregate(declaration: str) -> Aggregate:
+    """Parse an aggregate declared as ``<pattern> -> <function>``.
+
+    Args:
+        declaration: Declaration, e.g. ``*/status/hdf/frames_written -> sum``
+
+    Raises:
+        ValueError if the declaration is invalid
+
+    """
+    pattern, arrow, function = (part.strip() for part in declaration.partition("->"))
+    if not arrow or not pattern or function not in AGGREGATE_FUNCTIONS:
+        raise ValueError(
+            f"Invalid aggregate {declaration!r}, expected '<pattern> -> <function>' "
+            f"with function one of {', '.join(AGGREGATE_FUNCTIONS)}"
+        )
+
+    return Aggregate(pattern, function)
+
+
+class AggregateUpdater:
+    """Compute aggregate attributes from the attributes of indexed controllers.
+
+    The values of the source attributes of all aggregates are gathered into one
+    array, ordered by function, and each function is applied to all of its
+    aggregates with one ``reduceat``, so the cost per update is one vectorized
+    pass however many processes and aggregates there are.
+
+    """
+
+    def __init__(self) -> None:
+        self._aggregates: list[tuple[Aggregate, AttrR[Any], list[AttrR[Any]]]] = []
+        self._sources: list[AttrR[Any]] = []
+        self._segments: list[tuple[str, slice, np.ndarray]] = []
+
+    def add(
+        self,
+        aggregates: list[Aggregate],
+        adapter_controller: "OdinController",
+        indexed_controllers: dict[str, "OdinController"],
+    ) -> None:
+        """Add aggregate attributes to the controller of an adapter.
+
+        Args:
+            aggregates: Aggregates to add
+            adapter_controller: Controller of the parameters at the adapter root
+            indexed_controllers: Controller of each indexed process subtree
+
+        """
+        for aggregate in aggregates:
+            head, _, uri_pattern = aggregate.pattern.partition("/")
+            sources = [
+                attr
+                for idx, controller in indexed_controllers.items()
+                if fnmatchcase(idx, head)
+                for _, attr in controller.get_attributes([uri_pattern])
+            ]
+            datatype = _aggregate_datatype(aggregate, sources)
+            if datatype is None or hasattr(adapter_controller, aggregate.name):
+                logging.warning(
+                    "Cannot create aggregate %s of %s on %s",
+                    aggregate.name,
+                    aggregate.pattern,
+                    ":".join(adapter_controller.path),
+                )
+                continue
+
+            attr = AttrR(datatype, group="Aggregates")
+            setattr(adapter_controller, aggregate.name, attr)
+            self._aggregates.append((aggregate, attr, sources))
+
+        self._build_segments()
+
+    def get_sources(self) -> list[tuple[AttrR[Any], AttrR[Any]]]:
+        """Get each aggregate attribute and source attribute it is computed from."""
+        return [
+            (attr, source)
+            for _, attr, sources in self._aggregates
+            for source in sources
+        ]
+
+    def _build_segments(self) -> None:
+        # Order by function so the sources of each function are contiguous
+        functions = list(AGGREGATE_FUNCTIONS)
+        self._aggregates.sort(key=lambda a: functions.index(a[0].function))
+        self._sources = [
+            source for _, _, sources in self._aggregates for source in sources
+        ]
+        self._segments = []
+
+        start = 0
+        for function in AGGREGATE_FUNCTIONS:
+            offsets = []
+            end = start
+            for aggregate, _, sources in self._aggregates:
+                if aggregate.function == function:
+                    offsets.append(end - start)
+                    end += len(sources)
+
+            if offsets:
+                self._segments.append(
+                    (function, slice(start, end), np.array(offsets, dtype=np.intp))
+                )
+            start = end
+
+    def compute(self) -> list[Any]:
+        """Compute the value of every aggregate from the current source values.
+
+        Returns: Value of each aggregate, in the order of ``_aggregates``
+
+        """
+        values = np.fromiter(
+            (source.get() for source in self._sources),
+            dtype=np.float64,
+            count=len(self._sources),
+        )
+
+        results: list[Any] = []
+        for function, segment, offsets in self._segments:
+            reduced = AGGREGATE_FUNCTIONS[function].reduceat(values[segment], offsets)
+            if function == "mean":
+                counts = np.diff(np.append(offsets, segment.stop - segment.start))
+                reduced = reduced / counts
+            results += reduced.tolist()
+
+        return results
+
+    async def update(self) -> None:
+        """Set the aggregate attributes that have changed."""
+        if not self._aggregates:
+            return
+
+        for (_, attr, _), value in zip(self._aggregates, self.compute(), strict=True):
+            value = attr.datatype.dtype(value)
+            if value != attr.get():
+                await attr.set(value)
+
+
+def _is_wildcard(node: str) -> bool:
+    return any(c in node for c in "*?[")
+
+
+def _aggregate_datatype(
+    aggregate: Aggregate, sources: list[AttrR[Any]]
+) -> DataType[Any] | None:
+    """Get the datatype of an aggregate, or ``None`` if it cannot be computed."""
+    datatypes = {type(source.datatype) for source in sources}
+    if not datatypes or not datatypes <= {Bool, Int, Float}:
+        return None
+
+    match aggregate.function:
+        case "any" | "all":
+            return Bool()
+        case "mean":
+            return Float()
+        case "min" | "max" if datatypes == {Bool}:
+            return Bool()
+        case _ if Float in datatypes:
+            return Float()
+        case _:
+            return Int()
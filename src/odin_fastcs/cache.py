@@ -0,0 +1,74 @@
+import json
+import logging
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from odin_fastcs.util import create_odin_parameters, parameter_tree_hash
+
+
+class ParameterTreeCache:
+    """On-disk cache of the adapter parameter trees of an Odin server.
+
+    The trees of all adapters of the server are stored in one file, along with a hash
+    of the structure of each tree so that changes in the live trees can be detected.
+
+    Args:
+        directory: Directory to store cache files in
+        ip: IP address of Odin server
+        port: Port of Odin server
+
+    """
+
+    def __init__(self, directory: Path, ip: str, port: int):
+        self.path = directory / f"{ip}_{port}.json"
+        self.hashes: dict[str, str] = {}
+        """Structure hash of each adapter tree last loaded or saved."""
+
+    def load(self) -> dict[str, Mapping[str, Any]] | None:
+        """Load the cached adapter parameter trees.
+
+        Returns: Parameter tree for each adapter, or ``None`` if there is no valid cache
+
+        """
+        try:
+            with self.path.open() as f:
+                cache = json.loads(f.read())
+            trees = {
+                adapter: entry["tree"] for adapter, entry in cache["adapters"].items()
+            }
+            self.hashes = {
+                adapter: entry["hash"] for adapter, entry in cache["adapters"].items()
+            }
+            return trees
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning("Ignoring invalid cache %s: %s", self.path, e)
+            return None
+
+    def save(self, trees: Mapping[str, Mapping[str, Any]]) -> None:
+        """Store the parameter trees of all adapters in the cache.
+
+        Args:
+            trees: Parameter tree with metadata for each adapter
+
+        """
+        self.hashes = {adapter: tree_hash(tree) for adapter, tree in trees.items()}
+        cache = {
+            "adapters": {
+                adapter: {"hash": self.hashes[adapter], "tree": tree}
+                for adapter, tree in trees.items()
+            }
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename so a partially written cache is not read
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            f.write(json.dumps(cache))
+        tmp_path.replace(self.path)
+
+
+def tree_hash(tree: Mapping[str, Any]) -> str:
+    """Create a hash of the structure of an adapter parameter tree."""
+    return parameter_tree_hash(create_odin_parameters(tree))
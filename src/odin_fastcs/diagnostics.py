@@ -0,0 +1,123 @@
+import time
+
+from fastcs.attributes import AttrR
+from fastcs.controller import SubController
+from fastcs.datatypes import Float, Int, String
+from fastcs.util import snake_to_pascal
+from fastcs.wrappers import scan
+
+from odin_fastcs.errors import ErrorAggregator
+from odin_fastcs.http_connection import HTTPConnection, RequestStats
+
+LOOP_LAG_PERIOD = 0.1
+STATISTICS_PERIOD = 1.0
+
+
+class DiagnosticsController(SubController):
+    """Diagnostics of the connection to an Odin server and of the event loop.
+
+    The request rate, latency percentiles and errors of each adapter are published
+    every second. Latency percentiles are of the requests sent since the last update.
+
+    Args:
+        connection: Connection to Odin server
+        adapters: Adapters to publish request statistics of
+        error_aggregator: Aggregator to publish the last error of each adapter from
+        path: Path of the controller. If ``None``, ``["DIAG"]``.
+
+    """
+
+    request_rate = AttrR(Float(prec=1))
+    in_flight = AttrR(Int())
+    errors = AttrR(Int())
+    timeouts = AttrR(Int())
+    decode_time_ms = AttrR(Float(prec=3))
+    loop_lag_ms = AttrR(Float(prec=1))
+
+    def __init__(
+        self,
+        connection: HTTPConnection,
+        adapters: list[str],
+        error_aggregator: ErrorAggregator,
+        path: list[str] | None = None,
+    ):
+        super().__init__(path or ["DIAG"])
+
+        self._connection = connection
+        self._error_aggregator = error_aggregator
+        self._adapters = {
+            adapter: _AdapterAttributes(self, adapter) for adapter in adapters
+        }
+        self._last_update = time.monotonic()
+        self._last_requests = 0
+        self._last_adapter_requests: dict[str, int] = {}
+        self._last_decodes = (0, 0.0)
+        self._last_loop_tick = time.monotonic()
+        self._max_loop_lag = 0.0
+
+    @scan(LOOP_LAG_PERIOD)
+    async def measure_loop_lag(self) -> None:
+        """Measure how late this scan runs after its period."""
+        now = time.monotonic()
+        lag = now - self._last_loop_tick - LOOP_LAG_PERIOD
+        self._last_loop_tick = now
+        self._max_loop_lag = max(self._max_loop_lag, lag)
+
+    @scan(STATISTICS_PERIOD)
+    async def update_diagnostics(self) -> None:
+        stats = self._connection.stats
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+
+        await self.request_rate.set((stats.requests - self._last_requests) / elapsed)
+        self._last_requests = stats.requests
+        await self.in_flight.set(stats.in_flight)
+        await self.errors.set(stats.errors)
+        await self.timeouts.set(stats.timeouts)
+
+        decodes, decode_time = self._last_decodes
+        if stats.decodes > decodes:
+            await self.decode_time_ms.set(
+                1000 * (stats.decode_time - decode_time) / (stats.decodes - decodes)
+            )
+        self._last_decodes = (stats.decodes, stats.decode_time)
+
+        await self.loop_lag_ms.set(1000 * self._max_loop_lag)
+        self._max_loop_lag = 0.0
+
+        for adapter, attributes in self._adapters.items():
+            adapter_stats = stats.adapters.get(adapter, RequestStats())
+            last_requests = self._last_adapter_requests.get(adapter, 0)
+            self._last_adapter_requests[adapter] = adapter_stats.requests
+            requests = adapter_stats.requests - last_requests
+            await attributes.update(
+                adapter_stats,
+                requests / elapsed,
+                self._error_aggregator.last_errors[adapter],
+            )
+
+
+class _AdapterAttributes:
+    """Request statistics attributes of one adapter, added to a controller."""
+
+    def __init__(self, controller: DiagnosticsController, adapter: str):
+        group = snake_to_pascal(adapter)
+        self.request_rate = AttrR(Float(prec=1), group=group)
+        self.latency_p50_ms = AttrR(Float(), group=group)
+        self.latency_p99_ms = AttrR(Float(), group=group)
+        self.errors = AttrR(Int(), group=group)
+        self.last_error = AttrR(String(), group=group)
+
+        for name, attr in vars(self).items():
+            setattr(controller, f"{adapter}_{name}", attr)
+
+    async def update(
+        self, stats: RequestStats, request_rate: float, last_error: str
+    ) -> None:
+        await self.request_rate.set(request_rate)
+        await self.latency_p50_ms.set(1000 * stats.latency.percentile(50))
+        await self.latency_p99_ms.set(1000 * stats.latency.percentile(99))
+        await self.errors.set(stats.errors)
+        await self.last_error.set(last_error)
+        stats.latency.reset()
@@ -0,0 +1,84 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from odin_fastcs.http_connection import adapter_of
+
+EXAMPLE_PATHS = 3
+"""Number of example paths of each group of errors to log in summaries."""
+
+
+@dataclass
+class ErrorGroup:
+    """Errors with the same cause from one adapter within a reporting period."""
+
+    action: str
+    """What failed, e.g. "Update" or "Write"."""
+    error: str
+    """Exception type and message of the errors."""
+    count: int = 0
+    """Number of errors."""
+    paths: set[str] = field(default_factory=set)
+    """Paths of the parameters the errors are for."""
+
+    def describe(self) -> str:
+        paths = sorted(self.paths)
+        examples = ", ".join(paths[:EXAMPLE_PATHS])
+        if len(paths) > EXAMPLE_PATHS:
+            examples += f" and {len(paths) - EXAMPLE_PATHS} more"
+
+        return f"{self.action} of {examples} failed: {self.error}"
+
+
+class ErrorAggregator:
+    """Group errors by adapter, exception type and message and log periodic summaries.
+
+    The first error of each group in a reporting period is logged immediately and the
+    rest are counted and logged in one summary by ``flush``, with a few example paths,
+    so a persistent fault, e.g. an adapter timing out, produces a few lines per period
+    rather than one per poll of each parameter.
+
+    """
+
+    def __init__(self) -> None:
+        self._groups: dict[tuple[str, str, str, str], ErrorGroup] = {}
+        self.last_errors: dict[str, str] = defaultdict(str)
+        """Most recent error of each adapter."""
+
+    def report(self, action: str, path: str, error: Exception) -> None:
+        """Report an error.
+
+        Args:
+            action: What failed, e.g. "Update" or "Write"
+            path: Path of the parameter the error is for
+            error: Exception raised
+
+        """
+        adapter = adapter_of(path)
+        error_type = type(error).__name__
+        message = f"{action} of {path} failed: {error_type}: {error}"
+        self.last_errors[adapter] = message
+
+        key = (adapter, action, error_type, str(error))
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = ErrorGroup(action, f"{error_type}: {error}")
+            logging.error(message)
+
+        group.count += 1
+        group.paths.add(path)
+
+    def flush(self) -> None:
+        """Log a summary of the errors not already logged and start a new period."""
+        repeated = [group for group in self._groups.values() if group.count > 1]
+        if repeated:
+            logging.error(
+                "%d errors in %d groups since last summary:\n%s",
+                sum(group.count - 1 for group in repeated),
+                len(repeated),
+                "\n".join(
+                    f"  {group.count - 1} x {group.describe()}" for group in repeated
+                ),
+            )
+
+        self._groups.clear()
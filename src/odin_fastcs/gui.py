@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from importlib.metadata import version
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from fastcs.backends.epics.gui import EpicsGUIOptions
+from fastcs.mapping import Mapping
+
+if TYPE_CHECKING:
+    from fastcs.backends.epics.backend import EpicsBackend
+
+
+def gui_fingerprint(mapping: Mapping, pv_prefix: str) -> str:
+    """Create a hash of everything the GUI of a controller mapping is created from.
+
+    The hash depends on the controllers, their attributes and commands, the PV prefix
+    and the version of fastcs, not on the values of attributes, so it changes only if
+    the GUI created for the mapping would change.
+
+    Args:
+        mapping: Mapping of controllers to create GUI for
+        pv_prefix: PV prefix of IOC
+
+    Returns:
+        Hex digest of the structure of the GUI
+
+    """
+    structure: list = [version("fastcs"), pv_prefix]
+    for controller_mapping in mapping.get_controller_mappings():
+        structure.append(
+            [
+                controller_mapping.controller.path,
+                sorted(
+                    (name, type(attr).__name__, repr(attr.datatype), attr.group)
+                    for name, attr in controller_mapping.attributes.items()
+                ),
+                sorted(
+                    (name, command.group)
+                    for name, command in controller_mapping.command_methods.items()
+                ),
+            ]
+        )
+
+    return hashlib.sha256(json.dumps(structure).encode()).hexdigest()
+
+
+def create_gui(
+    backend: "EpicsBackend",
+    mapping: Mapping,
+    pv_prefix: str,
+    output_path: Path,
+    background: bool = False,
+) -> threading.Thread | None:
+    """Create the GUI of an IOC, unless an up to date GUI already exists.
+
+    The fingerprint of the mapping is stored alongside the GUI, in ``<GUI>.sha256``,
+    and the GUI is only created again if the fingerprint has changed.
+
+    Args:
+        backend: Backend of IOC
+        mapping: Mapping of controllers of ``backend``
+        pv_prefix: PV prefix of ``backend``
+        output_path: Path to write GUI to
+        background: Whether to create the GUI in a thread, so the IOC can be started
+            while it is created
+
+    Returns: Thread creating the GUI if it is created in the background, else ``None``
+
+    """
+    fingerprint = gui_fingerprint(mapping, pv_prefix)
+    fingerprint_path = output_path.with_name(f"{output_path.name}.sha256")
+    if (
+        output_path.exists()
+        and fingerprint_path.exists()
+        and fingerprint_path.read_text() == fingerprint
+    ):
+        logging.info("GUI %s is up to date", output_path)
+        return None
+
+    # Remove the fingerprint first so a GUI left partially written is not up to date
+    fingerprint_path.unlink(missing_ok=True)
+
+    def create() -> None:
+        start = time.monotonic()
+        backend.create_gui(options=EpicsGUIOptions(output_path=output_path))
+        fingerprint_path.write_text(fingerprint)
+        logging.info("Created GUI %s in %.3f s", output_path, time.monotonic() - start)
+
+    if not background:
+        create()
+        return None
+
+    thread = threading.Thread(target=create, name="create_gui", daemon=True)
+    thread.start()
+    return thread
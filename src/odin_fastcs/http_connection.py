@@ -1,17 +1,295 @@
-from collections.abc import Mapping
+import asyncio
+import bisect
+import logging
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, fields
+from types import SimpleNamespace
+from typing import Any
 
-from aiohttp import ClientResponse, ClientSession
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    StreamReader,
+    TCPConnector,
+    TraceConfig,
+    TraceConnectionQueuedEndParams,
+    TraceConnectionQueuedStartParams,
+)
+from fastcs.connections.ip_connection import IPConnectionSettings
+
+from odin_fastcs.json_codec import JsonCodec, get_json_codec
 
 ValueType = bool | int | float | str
 JsonElementary = str | int | float | bool | None
 JsonType = JsonElementary | list["JsonType"] | Mapping[str, "JsonType"]
 
 
+@dataclass
+class HTTPConnectionSettings(IPConnectionSettings):
+    """Settings for an ``HTTPConnection`` to an Odin server."""
+
+    port: int = 8888
+    pool_size: int = 100
+    """Maximum number of open connections. 0 for no limit."""
+    pool_size_per_host: int = 0
+    """Maximum number of open connections to the same endpoint. 0 for no limit."""
+    keepalive_timeout: float = 15.0
+    """Time to keep idle connections open for reuse, in seconds."""
+    connect_timeout: float | None = 2.0
+    """Time to wait for a free connection in the pool and connect, in seconds."""
+    read_timeout: float | None = 5.0
+    """Time to wait for each read of a response, in seconds."""
+    request_timeout: float | None = 10.0
+    """Time to wait for a whole request, including reading the response, in seconds."""
+    max_in_flight: int = 0
+    """Maximum number of requests awaiting a response at once. 0 for no limit."""
+    json_codec: str | None = None
+    """Name of JSON codec for payloads. ``None`` for the fastest installed codec."""
+    failure_threshold: int = 5
+    """Consecutive failed requests to stop sending requests after. 0 to never stop."""
+    backoff_initial: float = 0.5
+    """Time to wait before the first probe after requests stop, in seconds."""
+    backoff_max: float = 30.0
+    """Longest time to wait between probes, in seconds."""
+
+
+@dataclass
+class ConnectionStats:
+    """Usage statistics of an ``HTTPConnection``."""
+
+    requests: int = 0
+    """Number of requests sent."""
+    in_flight: int = 0
+    """Number of requests awaiting a response."""
+    peak_in_flight: int = 0
+    """Highest value of ``in_flight``."""
+    waiting: int = 0
+    """Number of requests waiting to be sent under ``max_in_flight``."""
+    timeouts: int = 0
+    """Number of requests that timed out."""
+    connections_created: int = 0
+    """Number of connections opened in the pool."""
+    connections_reused: int = 0
+    """Number of requests sent on an existing connection from the pool."""
+    pool_waits: int = 0
+    """Number of requests that had to wait for a free connection in the pool."""
+    pool_wait_time: float = 0.0
+    """Total time requests spent waiting for a free connection, in seconds."""
+    errors: int = 0
+    """Number of requests that failed without a response."""
+    rejected: int = 0
+    """Number of requests not sent because the circuit breaker was open."""
+    circuit_trips: int = 0
+    """Number of times the circuit breaker opened."""
+    decodes: int = 0
+    """Number of response payloads decoded."""
+    decode_time: float = 0.0
+    """Total time spent decoding response payloads, in seconds.
+
+    Includes the time spent parsing streamed responses, but not the time waiting for
+    them to arrive.
+    """
+    adapters: dict[str, "RequestStats"] = field(default_factory=dict)
+    """Statistics of the requests to each adapter."""
+
+
+class LatencyHistogram:
+    """Histogram of request latencies with logarithmic buckets from 0.1 ms to 13 s."""
+
+    BOUNDS = [1e-4 * 2 ** (i / 2) for i in range(35)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+
+    def record(self, latency: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, latency)] += 1
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        """Get the upper bound of the bucket containing the ``q`` th percentile.
+
+        Args:
+            q: Percentile in the range 0 to 100
+
+        Returns: Latency in seconds, or 0 if nothing has been recorded
+
+        """
+        if self.count == 0:
+            return 0.0
+
+        target = q / 100 * self.count
+        total = 0
+        for bound, count in zip(self.BOUNDS, self.counts, strict=False):
+            total += count
+            if total >= target:
+                return bound
+
+        return self.BOUNDS[-1]
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+
+
+@dataclass
+class RequestStats:
+    """Statistics of the requests to one adapter of an Odin server."""
+
+    requests: int = 0
+    """Number of requests sent."""
+    errors: int = 0
+    """Number of requests that failed without a response."""
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    """Latencies of requests since the histogram was last reset."""
+
+
+class CircuitOpenError(ConnectionError):
+    """Request not sent because the server has not responded to recent requests."""
+
+
+class CircuitBreaker:
+    """Stop sending requests to a server after repeated failures.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and requests
+    are rejected. Once the backoff has passed, one probe request is allowed through.
+    If it succeeds the circuit closes, otherwise the backoff is doubled, up to
+    ``backoff_max``. Failures of requests sent before the circuit opened are not
+    probe results, so they do not change the backoff.
+
+    """
+
+    def __init__(
+        self, failure_threshold: int, backoff_initial: float, backoff_max: float
+    ):
+        self._failure_threshold = failure_threshold
+        self._backoff_initial = backoff_initial
+        self._backoff_max = backoff_max
+        self._failures = 0
+        self._backoff = backoff_initial
+        self._retry_time: float | None = None
+        self._probing = False
+
+    @property
+    def open(self) -> bool:
+        """Whether requests are being rejected."""
+        return self._retry_time is not None
+
+    def allow_request(self) -> bool:
+        """Check if a request can be sent, and if so whether it is a probe."""
+        if self._retry_time is None:
+            return True
+        elif self._probing or time.monotonic() < self._retry_time:
+            return False
+
+        self._probing = True
+        return True
+
+    def record_success(self) -> bool:
+        """Record a successful request.
+
+        Returns: ``True`` if the circuit was open and is now closed
+
+        """
+        was_open = self.open
+        self._failures = 0
+        self._backoff = self._backoff_initial
+        self._retry_time = None
+        self._probing = False
+        return was_open
+
+    def record_failure(self, probe: bool = False) -> bool:
+        """Record a failed request.
+
+        Args:
+            probe: Whether the request was the probe allowed through while the
+                circuit is open
+
+        Returns: ``True`` if the circuit was closed and is now open
+
+        """
+        self._failures += 1
+        if self.open:
+            if probe:
+                self._probing = False
+                self._backoff = min(2 * self._backoff, self._backoff_max)
+                self._retry_time = time.monotonic() + self._backoff
+            return False
+        elif 0 < self._failure_threshold <= self._failures:
+            self._retry_time = time.monotonic() + self._backoff
+            return True
+
+        return False
+
+    def cancel_probe(self) -> None:
+        """Allow another probe if a probe was cancelled before it completed."""
+        self._probing = False
+
+
+class _TimedReader:
+    """Wrap a stream to record the time spent waiting for reads."""
+
+    def __init__(self, stream: StreamReader):
+        self._stream = stream
+        self.read_time = 0.0
+
+    async def read(self, n: int = -1) -> bytes:
+        start = time.monotonic()
+        try:
+            return await self._stream.read(n)
+        finally:
+            self.read_time += time.monotonic() - start
+
+
+def adapter_of(uri: str) -> str:
+    """Get the adapter a URI is in, e.g. ``fp`` for ``api/0.1/fp/0/status``."""
+    nodes = uri.split("/")
+    return nodes[2] if nodes[0] == "api" and len(nodes) > 2 else nodes[0]
+
+
 class HTTPConnection:
-    def __init__(self, ip: str, port: int):
+    def __init__(
+        self,
+        ip: str,
+        port: int,
+        settings: HTTPConnectionSettings | None = None,
+    ):
         self._session: ClientSession | None = None
         self._ip = ip
         self._port = port
+        self._settings = settings or HTTPConnectionSettings(ip, port)
+        self._in_flight_limit: asyncio.Semaphore | None = None
+        self._codec: JsonCodec = get_json_codec(self._settings.json_codec)
+        self._breaker = CircuitBreaker(
+            self._settings.failure_threshold,
+            self._settings.backoff_initial,
+            self._settings.backoff_max,
+        )
+        self.stats = ConnectionStats()
+
+    @property
+    def connected(self) -> bool:
+        """Whether the server is responding to requests."""
+        return not self._breaker.open
+
+    @classmethod
+    def from_settings(cls, settings: IPConnectionSettings) -> "HTTPConnection":
+        """Create a connection from ``IPConnectionSettings``.
+
+        If ``settings`` is an ``HTTPConnectionSettings``, the connection pool and
+        timeouts are configured from it, otherwise the defaults are used.
+
+        """
+        if not isinstance(settings, HTTPConnectionSettings):
+            settings = HTTPConnectionSettings(
+                **{f.name: getattr(settings, f.name) for f in fields(settings)}
+            )
+
+        return cls(settings.ip, settings.port, settings)
 
     def full_url(self, uri: str) -> str:
         """Expand IP address, port and URI into full URL.
@@ -29,7 +307,54 @@ class HTTPConnection:
         asyncio loop.
 
         """
-        self._session = ClientSession()
+        settings = self._settings
+        self._session = ClientSession(
+            connector=TCPConnector(
+                limit=settings.pool_size,
+                limit_per_host=settings.pool_size_per_host,
+                keepalive_timeout=settings.keepalive_timeout,
+            ),
+            timeout=ClientTimeout(
+                total=settings.request_timeout,
+                connect=settings.connect_timeout,
+                sock_read=settings.read_timeout,
+            ),
+            trace_configs=[self._create_trace_config()],
+        )
+        self._in_flight_limit = (
+            asyncio.Semaphore(settings.max_in_flight)
+            if settings.max_in_flight > 0
+            else None
+        )
+
+    def _create_trace_config(self) -> TraceConfig:
+        async def on_connection_create_end(*_: Any) -> None:
+            self.stats.connections_created += 1
+
+        async def on_connection_reuseconn(*_: Any) -> None:
+            self.stats.connections_reused += 1
+
+        async def on_connection_queued_start(
+            _: ClientSession,
+            context: SimpleNamespace,
+            __: TraceConnectionQueuedStartParams,
+        ) -> None:
+            self.stats.pool_waits += 1
+            context.queued_time = time.monotonic()
+
+        async def on_connection_queued_end(
+            _: ClientSession,
+            context: SimpleNamespace,
+            __: TraceConnectionQueuedEndParams,
+        ) -> None:
+            self.stats.pool_wait_time += time.monotonic() - context.queued_time
+
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_connection_queued_start.append(on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(on_connection_queued_end)
+        return trace_config
 
     def get_session(self) -> ClientSession:
         """Get session or raise exception if session is not open.
@@ -44,6 +369,106 @@ class HTTPConnection:
 
         raise ConnectionRefusedError("Session is not open")
 
+    @asynccontextmanager
+    async def _request(
+        self, method: str, uri: str, **kwargs: Any
+    ) -> AsyncIterator[ClientResponse]:
+        """Send a request, waiting if ``max_in_flight`` requests are already sent.
+
+        Args:
+            method: HTTP method
+            uri: Identifier for resource
+            kwargs: Arguments to pass to ``ClientSession.request``
+
+        Returns: Response
+
+        Raises:
+            CircuitOpenError if requests are being rejected after repeated failures
+
+        """
+        if not self._breaker.allow_request():
+            self.stats.rejected += 1
+            raise CircuitOpenError(f"Not sending request to {uri}: server is down")
+
+        # A request allowed through while the circuit is open is the probe
+        probe = self._breaker.open
+        if probe:
+            # Replace any connections broken while the server was down
+            await self._reopen()
+
+        session = self.get_session()
+        adapter = adapter_of(uri)
+        if adapter not in self.stats.adapters:
+            self.stats.adapters[adapter] = RequestStats()
+        adapter_stats = self.stats.adapters[adapter]
+
+        async with self._in_flight_slot():
+            self.stats.requests += 1
+            adapter_stats.requests += 1
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(
+                self.stats.peak_in_flight, self.stats.in_flight
+            )
+            start = time.monotonic()
+            try:
+                async with session.request(
+                    method, self.full_url(uri), **kwargs
+                ) as response:
+                    adapter_stats.latency.record(time.monotonic() - start)
+                    if self._breaker.record_success():
+                        logging.info("Odin server at %s is responding", self._ip)
+                    yield response
+            except (TimeoutError, ClientError) as e:
+                if isinstance(e, TimeoutError):
+                    self.stats.timeouts += 1
+                self.stats.errors += 1
+                adapter_stats.errors += 1
+                if self._breaker.record_failure(probe):
+                    self.stats.circuit_trips += 1
+                    logging.error(
+                        "Odin server at %s is not responding, "
+                        "stopping requests until it is: %s",
+                        self._ip,
+                        e,
+                    )
+                raise
+            except asyncio.CancelledError:
+                if probe:
+                    self._breaker.cancel_probe()
+                raise
+            finally:
+                self.stats.in_flight -= 1
+
+    async def _reopen(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+        self.open()
+
+    def _decode(self, payload: bytes) -> Any:
+        start = time.monotonic()
+        try:
+            return self._codec.loads(payload)
+        finally:
+            self.stats.decodes += 1
+            self.stats.decode_time += time.monotonic() - start
+
+    @asynccontextmanager
+    async def _in_flight_slot(self) -> AsyncIterator[None]:
+        if self._in_flight_limit is None:
+            yield
+            return
+
+        self.stats.waiting += 1
+        try:
+            await self._in_flight_limit.acquire()
+        finally:
+            self.stats.waiting -= 1
+
+        try:
+            yield
+        finally:
+            self._in_flight_limit.release()
+
     async def get(self, uri: str, headers: dict | None = None) -> dict[str, JsonType]:
         """Perform HTTP GET request and return response content as JSON.
 
@@ -53,14 +478,54 @@ class HTTPConnection:
         Returns: Response payload as JSON
 
         """
-        session = self.get_session()
-        async with session.get(self.full_url(uri), headers=headers) as response:
-            match await response.json():
+        async with self._request("GET", uri, headers=headers) as response:
+            match self._decode(await response.read()):
                 case dict() as d:
                     return d
                 case _:
                     raise ValueError(f"Got unexpected response:\n{response}")
 
+    async def iter_items(
+        self, uri: str, headers: dict | None = None
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Perform HTTP GET request and iterate the items of the JSON object response.
+
+        If ``ijson`` is installed, the response is parsed incrementally by ``ijson``
+        as it is read, rather than by the codec, so each item is yielded as soon as
+        it has arrived and neither the payload nor the whole decoded response is held
+        at once. Otherwise the whole response is decoded first by the codec.
+
+        Args:
+            uri: Identifier for resource
+            headers: Headers of request
+
+        Returns: Key and value of each item of the response, in order
+
+        """
+        try:
+            import ijson
+        except ImportError:
+            for item in (await self.get(uri, headers)).items():
+                yield item
+            return
+
+        async with self._request("GET", uri, headers=headers) as response:
+            # Count the parsing interleaved with the reads as one decode, excluding
+            # the time waiting for the response and the time the items are consumed
+            start = time.monotonic()
+            consume_time = 0.0
+            reader = _TimedReader(response.content)
+            try:
+                async for item in ijson.kvitems_async(reader, "", use_float=True):
+                    yielded = time.monotonic()
+                    yield item
+                    consume_time += time.monotonic() - yielded
+            finally:
+                self.stats.decodes += 1
+                self.stats.decode_time += (
+                    time.monotonic() - start - reader.read_time - consume_time
+                )
+
     async def get_bytes(self, uri: str) -> tuple[ClientResponse, bytes]:
         """Perform HTTP GET request and return response content as bytes.
 
@@ -70,8 +535,7 @@ class HTTPConnection:
         Returns: ClientResponse header and response payload as bytes
 
         """
-        session = self.get_session()
-        async with session.get(self.full_url(uri)) as response:
+        async with self._request("GET", uri) as response:
             return response, await response.read()
 
     async def put(self, uri: str, value: ValueType) -> JsonType:
@@ -86,13 +550,13 @@ class HTTPConnection:
         Returns: ClientResponse header and response payload as bytes
 
         """
-        session = self.get_session()
-        async with session.put(
-            self.full_url(uri),
-            json=value,
+        async with self._request(
+            "PUT",
+            uri,
+            data=self._codec.dumps(value),
             headers={"Content-Type": "application/json"},
         ) as response:
-            return await response.json()
+            return self._decode(await response.read())
 
     async def close(self):
         """Close the underlying aiohttp ClientSession."""
@@ -0,0 +1,98 @@
+import json
+from typing import Any, Protocol
+
+
+class JsonCodec(Protocol):
+    """Encoder and decoder for JSON request and response payloads."""
+
+    name: str
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a JSON payload."""
+        ...
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value as a JSON payload."""
+        ...
+
+
+class StdlibJsonCodec:
+    """``JsonCodec`` using the standard library ``json`` module."""
+
+    name = "json"
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value).encode()
+
+
+class OrjsonCodec:
+    """``JsonCodec`` using ``orjson``."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, value: Any) -> bytes:
+        return self._orjson.dumps(value)
+
+
+class MsgspecJsonCodec:
+    """``JsonCodec`` using ``msgspec``."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data: bytes) -> Any:
+        return self._decoder.decode(data)
+
+    def dumps(self, value: Any) -> bytes:
+        return self._encoder.encode(value)
+
+
+JSON_CODECS: dict[str, type[JsonCodec]] = {
+    codec.name: codec for codec in (OrjsonCodec, MsgspecJsonCodec, StdlibJsonCodec)
+}
+"""Available codecs, in order of preference."""
+
+
+def get_json_codec(name: str | None = None) -> JsonCodec:
+    """Get a ``JsonCodec`` by name, or the fastest installed codec.
+
+    Args:
+        name: Name of codec in ``JSON_CODECS``. If ``None``, the first codec whose
+            library is installed is used, falling back to the standard library.
+
+    Raises:
+        ValueError if ``name`` is not a known codec
+        ImportError if the library for ``name`` is not installed
+
+    """
+    if name is not None:
+        if name not in JSON_CODECS:
+            raise ValueError(
+                f"Unknown JSON codec {name}, expected one of {list(JSON_CODECS)}"
+            )
+
+        return JSON_CODECS[name]()
+
+    for codec in JSON_CODECS.values():
+        try:
+            return codec()
+        except ImportError:
+            pass
+
+    return StdlibJsonCodec()
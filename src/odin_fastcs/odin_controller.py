@@ -1,7 +1,14 @@
 import asyncio
+import contextlib
 import logging
-from collections.abc import Mapping
-from dataclasses import dataclass
+import math
+import time
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Collection, Mapping
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from functools import partial
+from pathlib import Path
 from typing import Any
 
 from fastcs.attributes import AttrR, AttrRW, AttrW, Handler
@@ -9,26 +16,150 @@ from fastcs.connections.ip_connection import IPConnectionSettings
 from fastcs.controller import Controller, SubController
 from fastcs.datatypes import Bool, Float, Int, String
 from fastcs.util import snake_to_pascal
+from fastcs.wrappers import scan
 
-from odin_fastcs.http_connection import HTTPConnection
+from odin_fastcs.aggregates import Aggregate, AggregateUpdater
+from odin_fastcs.cache import ParameterTreeCache, tree_hash
+from odin_fastcs.diagnostics import DiagnosticsController
+from odin_fastcs.errors import ErrorAggregator
+from odin_fastcs.http_connection import (
+    CircuitOpenError,
+    HTTPConnection,
+    HTTPConnectionSettings,
+)
+from odin_fastcs.profiles import PollingProfile, select_polling_profile
+from odin_fastcs.scheduler import PollScheduler
 from odin_fastcs.util import (
-    create_odin_parameters,
+    OdinParameter,
+    ParameterNode,
+    create_parameter_trie,
+    get_response_subtree,
 )
+from odin_fastcs.workers import PollWorkerPool
 
 types = {"float": Float(), "int": Int(), "bool": Bool(), "str": String()}
 
 REQUEST_METADATA_HEADER = {"Accept": "application/json;metadata=true"}
 IGNORED_ADAPTERS = ["od_fps", "od_frs", "od_mls"]
+ERROR_SUMMARY_PERIOD = 10.0
+DEMAND_TIMEOUT = 60.0
+"""Time to poll parameters at their poll period for after they are demanded."""
 
 
 class AdapterResponseError(Exception): ...
 
 
+_UNSET = object()
+
+
+@dataclass
+class UpdateCounters:
+    """Counts of the values published to, suppressed for, or failed for attributes."""
+
+    published: int = 0
+    """Number of values set on attributes."""
+    suppressed: int = 0
+    """Number of polled values not set on attributes because they had not changed."""
+    failed: int = 0
+    """Number of polls of attributes that failed."""
+
+
 @dataclass
 class ParamTreeHandler(Handler):
     path: str
     update_period: float = 0.2
     allowed_values: dict[int, str] | None = None
+    heartbeat_period: float | None = None
+    """Period to set the attribute at when its value has not changed, in seconds.
+
+    If ``None``, unchanged values are never set. If ``0``, every polled value is set.
+    """
+    priority: int = 0
+    """Priority of polls of the parameter when polls are scheduled."""
+    max_update_period: float | None = None
+    """Longest period to poll the parameter at while its value is not changing.
+
+    The poll period is doubled after every ``stable_polls`` polls without a change, up
+    to this period, and reset to ``base_period`` when the parameter is written or a
+    parameter next to it changes. If ``None``, the parameter is always polled at
+    ``base_period``.
+    """
+    stable_polls: int = 5
+    """Number of polls without a change before the poll period is doubled."""
+    idle_period: float | None = None
+    """Period to poll the parameter at while there is no demand for it, in seconds.
+
+    Demand is registered with ``demand`` and lasts for a given time. If ``None``,
+    the parameter is always polled as if demanded.
+    """
+    base_period: float = field(init=False)
+    """Period to poll the parameter at while it is changing, in seconds.
+
+    This is ``update_period`` unless set by a polling profile. Periods shorter than
+    ``update_period`` are polled at ``update_period``.
+    """
+    poll_period: float = field(init=False)
+    """Current period the parameter is polled at, in seconds."""
+    _unchanged_polls: int = field(default=0, init=False, repr=False)
+    _last_poll_time: float = field(default=-math.inf, init=False, repr=False)
+    _last_value: Any = field(default=_UNSET, init=False, repr=False)
+    _last_publish_time: float = field(default=0.0, init=False, repr=False)
+    _demanded_until: float = field(default=-math.inf, init=False, repr=False)
+
+    def __post_init__(self):
+        self.base_period = self.poll_period = self.update_period
+
+    @property
+    def adaptive(self) -> bool:
+        return self.max_update_period is not None
+
+    @property
+    def demanded(self) -> bool:
+        return self.idle_period is None or time.monotonic() < self._demanded_until
+
+    @property
+    def current_period(self) -> float:
+        """Period the parameter is polled at, allowing for demand."""
+        if self.demanded:
+            return self.poll_period
+
+        return max(self.poll_period, self.idle_period)  # type: ignore
+
+    def demand(self, duration: float) -> None:
+        """Poll the parameter at its poll period for a time.
+
+        Args:
+            duration: Time to poll for in seconds, or ``math.inf`` to always poll
+
+        """
+        if not self.demanded:
+            self.reset_poll_period()
+
+        self._demanded_until = max(self._demanded_until, time.monotonic() + duration)
+
+    def reset_poll_period(self) -> None:
+        """Poll the parameter at ``base_period`` again."""
+        self.poll_period = self.base_period
+        self._unchanged_polls = 0
+
+    def set_base_period(self, period: float | None) -> None:
+        """Set the period to poll the parameter at while it is changing.
+
+        Args:
+            period: Period in seconds, or ``None`` for ``update_period``
+
+        """
+        self.base_period = period if period is not None else self.update_period
+        self.reset_poll_period()
+
+    def _poll_due(self, last_poll_time: float) -> bool:
+        period = self.current_period
+        if period <= self.update_period:
+            return True
+
+        # Allow for jitter in the scan loop, which ticks every update period
+        elapsed = time.monotonic() - last_poll_time
+        return elapsed >= period - self.update_period / 2
 
     async def put(
         self,
@@ -36,51 +167,454 @@ class ParamTreeHandler(Handler):
         attr: AttrW[Any],
         value: Any,
     ) -> None:
+        # The attribute now shows the demanded value, so the next readback must be set
+        # even if it is equal to the last published value
+        self._last_value = _UNSET
+        self.reset_poll_period()
+        self.demand(DEMAND_TIMEOUT)
         try:
-            response = await controller._connection.put(self.path, value)
-            match response:
-                case {"error": error}:
-                    raise AdapterResponseError(error)
+            await controller.write_parameter(self.path, value)
         except Exception as e:
-            logging.error("Update loop failed for %s:\n%s", self.path, e)
+            controller.error_aggregator.report("Write", self.path, e)
 
     async def update(
         self,
         controller: "OdinController",
         attr: AttrR[Any],
     ) -> None:
+        if not self._poll_due(self._last_poll_time):
+            return
+
+        self._last_poll_time = time.monotonic()
+        if controller.scheduler is not None:
+            controller.scheduler.submit(
+                self.path,
+                partial(self.poll, controller, attr),
+                self.current_period,
+                self.priority,
+            )
+        else:
+            await self.poll(controller, attr)
+
+    async def poll(self, controller: "OdinController", attr: AttrR[Any]) -> None:
+        """Get the value of the parameter and set it on the attribute."""
+        try:
+            value = await self._get_value(controller)
+            await self._publish(controller, attr, value)
+        except CircuitOpenError:
+            # The server is down and its recovery is logged by the connection
+            pass
+        except Exception as e:
+            controller.update_counters.failed += 1
+            controller.error_aggregator.report("Update", self.path, e)
+
+    async def _publish(
+        self, controller: "OdinController", attr: AttrR[Any], value: Any
+    ) -> None:
+        """Set the value of the attribute if it has changed or a heartbeat is due."""
+        now = time.monotonic()
+        changed = value != self._last_value
+        if self.adaptive:
+            if changed:
+                controller.parameter_changed(self)
+            else:
+                self._slow_down()
+
+        if not changed and (
+            self.heartbeat_period is None
+            or now - self._last_publish_time < self.heartbeat_period
+        ):
+            controller.update_counters.suppressed += 1
+            return
+
+        await attr.set(value)
+        self._last_value = value
+        self._last_publish_time = now
+        controller.update_counters.published += 1
+
+    def _slow_down(self) -> None:
+        assert self.max_update_period is not None
+
+        self._unchanged_polls += 1
+        if self._unchanged_polls >= self.stable_polls:
+            self._unchanged_polls = 0
+            poll_period = min(
+                2 * self.poll_period, max(self.max_update_period, self.base_period)
+            )
+            if poll_period != self.poll_period:
+                logging.debug(
+                    "Polling %s every %.1f s as it is not changing",
+                    self.path,
+                    poll_period,
+                )
+                self.poll_period = poll_period
+
+    async def _get_value(self, controller: "OdinController") -> Any:
+        response = await controller._connection.get(self.path)
+
+        # TODO: This would be nicer if the key was 'value' so we could match
+        parameter = self.path.split("/")[-1]
+        value = response.get(parameter, None)
+        if value is None:
+            # The message is the same for every parameter so the errors are grouped
+            logging.debug("%s not found in response:\n%s", self.path, response)
+            raise ValueError("Parameter not found in response")
+
+        return value
+
+
+@dataclass
+class PollWorkerSender:
+    """Sender of an attribute of a parameter polled by a ``PollWorkerPool``.
+
+    This is not an ``Updater``, so the backend does not poll the attribute.
+
+    """
+
+    handler: ParamTreeHandler
+
+    async def put(
+        self, controller: "OdinController", attr: AttrW[Any], value: Any
+    ) -> None:
+        await self.handler.put(controller, attr, value)
+
+
+class ParamTreePoller:
+    """Poll a subtree of an Odin parameter tree with a single request.
+
+    The response is fanned out to the attributes of all of the handlers added to the
+    poller, matched to the attributes by the ``node`` of the subtree in the trie of
+    parameters of the controller. Calls to ``update`` made while an update is in
+    progress, or within ``max_age`` seconds of the last update starting, are ignored.
+    This means all of the attributes under the subtree, which are updated together in
+    the same scan, are updated with one GET per poll. The subtree is polled at the
+    shortest poll period of the handlers.
+
+    """
+
+    def __init__(
+        self,
+        connection: HTTPConnection,
+        path: str,
+        max_age: float,
+        node: ParameterNode,
+    ):
+        self.path = path
+        self._connection = connection
+        self._node = node
+        self._max_age = max_age
+        self._handlers: dict[
+            ParameterNode, tuple[BatchedParamTreeHandler, AttrR[Any]]
+        ] = {}
+        self._update: asyncio.Future[None] | None = None
+        self._update_time = 0.0
+        self._poll_due_time = -math.inf
+        self._poll_due = True
+
+    @property
+    def priority(self) -> int:
+        """Highest priority of the handlers of the poller."""
+        return max(
+            (handler.priority for handler, _ in self._handlers.values()), default=0
+        )
+
+    @property
+    def poll_period(self) -> float:
+        """Shortest poll period of the handlers of the poller."""
+        return min(handler.current_period for handler, _ in self._handlers.values())
+
+    def poll_due(self) -> bool:
+        """Whether any handler is due to be polled.
+
+        This is checked once per scan, rather than for every handler in the scan.
+
+        """
+        now = time.monotonic()
+        if now - self._poll_due_time > self._max_age:
+            self._poll_due_time = now
+            self._poll_due = any(
+                handler._poll_due(self._update_time)
+                for handler, _ in self._handlers.values()
+            )
+
+        return self._poll_due
+
+    def add(
+        self, leaf: ParameterNode, handler: "BatchedParamTreeHandler", attr: AttrR[Any]
+    ):
+        """Add the handler of the parameter of a leaf under the node of the poller."""
+        self._handlers[leaf] = (handler, attr)
+
+    async def update(self, controller: "OdinController") -> None:
+        """Poll the subtree and update attributes, unless updated within max age."""
+        if self._update is None or (
+            self._update.done() and time.monotonic() - self._update_time > self._max_age
+        ):
+            self._update_time = time.monotonic()
+            self._update = asyncio.ensure_future(self._update_attributes(controller))
+
+        # Shield so that one cancelled caller does not cancel the update for the rest
+        await asyncio.shield(self._update)
+
+    async def _update_attributes(self, controller: "OdinController") -> None:
         try:
-            response = await controller._connection.get(self.path)
+            tree = await self._fetch()
+        except CircuitOpenError:
+            return
+        except Exception as e:
+            controller.update_counters.failed += len(self._handlers)
+            controller.error_aggregator.report("Update", self.path, e)
+            return
+
+        for leaf, value in self._node.iter_values(tree):
+            if leaf not in self._handlers:
+                continue
+
+            handler, attr = self._handlers[leaf]
+            try:
+                await handler._publish(controller, attr, value)
+            except Exception as e:
+                controller.update_counters.failed += 1
+                controller.error_aggregator.report("Update", handler.path, e)
+
+    async def _fetch(self) -> Any:
+        return get_response_subtree(self.path, await self._connection.get(self.path))
+
+
+@dataclass(kw_only=True)
+class BatchedParamTreeHandler(ParamTreeHandler):
+    """``ParamTreeHandler`` updated by a shared ``ParamTreePoller``."""
+
+    poller: ParamTreePoller
+
+    async def update(
+        self,
+        controller: "OdinController",
+        attr: AttrR[Any],
+    ) -> None:
+        if not self.poller.poll_due():
+            return
+
+        if controller.scheduler is not None:
+            controller.scheduler.submit(
+                self.poller.path,
+                partial(self.poller.update, controller),
+                self.poller.poll_period,
+                self.poller.priority,
+            )
+        else:
+            await self.poller.update(controller)
+
+
+class ParamTreeWriter:
+    """Merge writes made within a short window into one PUT to their common parent.
 
-            # TODO: This would be nicer if the key was 'value' so we could match
-            parameter = self.path.split("/")[-1]
-            value = response.get(parameter, None)
-            if value is None:
-                raise ValueError(f"{parameter} not found in response:\n{response}")
+    If the merged PUT fails, each write is retried with its own PUT so that errors
+    are reported for the parameters that caused them.
 
-            await attr.set(value)
+    Args:
+        controller: Controller to send PUTs for
+        window: Time to collect writes for after the first, in seconds
+
+    """
+
+    def __init__(self, controller: "OdinController", window: float):
+        self._controller = controller
+        self._window = window
+        self._pending: dict[str, tuple[Any, asyncio.Future[None]]] = {}
+        self._flush_task: asyncio.Task | None = None
+
+    async def write(self, path: str, value: Any) -> None:
+        """Queue a write and wait for it to be sent.
+
+        Args:
+            path: Full path of parameter
+            value: Value to write
+
+        Raises:
+            Exception from the PUT of the parameter if it fails
+
+        """
+        future = asyncio.get_running_loop().create_future()
+        if path in self._pending:
+            # Superseded by this write
+            _resolve(self._pending[path][1])
+
+        self._pending[path] = (value, future)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+        await future
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self._window)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+
+        try:
+            await self._send(pending)
         except Exception as e:
-            logging.error("Update loop failed for %s:\n%s", self.path, e)
+            for _, future in pending.values():
+                _resolve(future, e)
+
+    async def _send(self, pending: dict[str, tuple[Any, asyncio.Future[None]]]):
+        parent, values = self._merge(
+            {path: value for path, (value, _) in pending.items()}
+        )
+        if len(pending) > 1 and values is not None:
+            try:
+                await self._controller._put(parent, values)
+            except Exception as e:
+                logging.warning(
+                    "Merged write to %s failed, retrying individually: %s", parent, e
+                )
+            else:
+                for _, future in pending.values():
+                    _resolve(future)
+                return
+
+        for path, (value, future) in pending.items():
+            try:
+                await self._controller._put(path, value)
+            except Exception as e:
+                _resolve(future, e)
+            else:
+                _resolve(future)
+
+    @staticmethod
+    def _merge(writes: dict[str, Any]) -> tuple[str, dict[str, Any] | None]:
+        """Merge writes into a nested value for a PUT to their common parent.
+
+        Returns: Parent path and merged value, or ``None`` if the writes cannot be
+            merged because the relative path of one of them indexes into a list
+
+        """
+        uris = [path.split("/") for path in writes]
+        depth = 0
+        while all(len(uri) > depth + 1 for uri in uris) and (
+            len({uri[depth] for uri in uris}) == 1
+        ):
+            depth += 1
+        parent = "/".join(uris[0][:depth])
+
+        merged: dict[str, Any] = {}
+        for uri, value in zip(uris, writes.values(), strict=True):
+            if any(node.isdigit() for node in uri[depth:]):
+                return parent, None
+
+            node = merged
+            for node_name in uri[depth:-1]:
+                node = node.setdefault(node_name, {})
+            node[uri[-1]] = value
+
+        return parent, merged
+
+
+def _resolve(future: asyncio.Future[None], error: Exception | None = None):
+    """Complete a future if it has not been cancelled by its waiter."""
+    if future.done():
+        return
+
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
+
+
+async def _iter_items(tree: Mapping[str, Any]) -> AsyncIterator[tuple[str, Any]]:
+    for item in tree.items():
+        yield item
 
 
 class OdinController(SubController):
+    """Controller for a parameter tree, or subtree, of an Odin adapter.
+
+    Args:
+        connection: Connection to Odin server
+        param_tree: Parameter tree with metadata
+        api_prefix: Path of ``param_tree`` in the Odin server API
+        path: Path of the controller, used as the prefix of its attributes
+        batch_depth: Depth of ``param_tree`` to poll subtrees at, instead of polling
+            each parameter individually; ``0`` polls the whole tree with one request,
+            ``1`` polls each top level node with one request, etc. If ``None``, each
+            parameter is polled individually.
+        heartbeat_period: Period to set attributes at when their values have not
+            changed. If ``None``, only changed values are set.
+        write_window: Time to collect writes for and merge into a single PUT, in
+            seconds. If ``None``, each write is sent immediately.
+        max_update_period: Longest period to poll parameters at while they are not
+            changing. If ``None``, parameters are always polled at the update period.
+        idle_period: Period to poll parameters at while there is no demand for them.
+            If ``None``, parameters are always polled as if demanded.
+        poll_workers: Pool of worker processes to poll the subtrees at
+            ``batch_depth`` with. If ``None``, parameters are polled by the
+            attribute updaters.
+        scheduler: Scheduler to run polls with. If ``None``, polls are run directly by
+            the attribute updaters.
+        error_aggregator: Aggregator to report update and write errors to, shared
+            with other controllers. If ``None``, the controller has its own.
+
+    """
+
     def __init__(
         self,
         connection: HTTPConnection,
         param_tree: Mapping[str, Any],
         api_prefix: str,
-        process_prefix: str,
+        path: list[str],
+        batch_depth: int | None = None,
+        heartbeat_period: float | None = None,
+        write_window: float | None = None,
+        max_update_period: float | None = None,
+        idle_period: float | None = None,
+        poll_workers: PollWorkerPool | None = None,
+        scheduler: PollScheduler | None = None,
+        error_aggregator: ErrorAggregator | None = None,
     ):
-        super().__init__(process_prefix)
+        super().__init__(path)
 
         self._connection = connection
         self._param_tree = param_tree
         self._api_prefix = api_prefix
+        self._batch_depth = batch_depth
+        self._heartbeat_period = heartbeat_period
+        self._max_update_period = max_update_period
+        self._idle_period = idle_period
+        self._poll_workers = poll_workers
+        self._parameters = ParameterNode("")
+        self._pollers: dict[str, ParamTreePoller] = {}
+        self._attributes: dict[str, tuple[ParamTreeHandler, AttrR[Any]]] = {}
+        self._leaves: dict[ParameterNode, tuple[ParamTreeHandler, AttrR[Any]]] = {}
+        self._siblings: dict[str, list[ParamTreeHandler]] = defaultdict(list)
+        self._writer = (
+            ParamTreeWriter(self, write_window) if write_window is not None else None
+        )
+        self.scheduler = scheduler
+        self.error_aggregator = error_aggregator or ErrorAggregator()
+        self.update_counters = UpdateCounters()
+        self._poll_period_attributes = (
+            _PollPeriodAttributes(self)
+            if max_update_period is not None or idle_period is not None
+            else None
+        )
 
-    async def _create_parameter_tree(self):
-        parameters = create_odin_parameters(self._param_tree)
+    async def _create_parameter_tree(self, parameters: ParameterNode | None = None):
+        """Create attributes for the parameters of the parameter tree.
 
-        for parameter in parameters:
+        Args:
+            parameters: Trie of the parameters of the parameter tree, which may be
+                shared with controllers of trees with the same structure. If ``None``,
+                it is created from the parameter tree.
+
+        """
+        self._parameters = (
+            parameters
+            if parameters is not None
+            else create_parameter_trie(self._param_tree)
+        )
+
+        for leaf in self._parameters.leaves():
+            parameter = OdinParameter(uri=leaf.uri, metadata=leaf.metadata)  # type: ignore
             if "writeable" in parameter.metadata and parameter.metadata["writeable"]:
                 attr_class = AttrRW
             else:
@@ -104,38 +638,490 @@ class OdinController(SubController):
             else:
                 group = None
 
+            handler = self._create_handler(parameter, allowed)
             attr = attr_class(
                 types[parameter.metadata["type"]],
-                handler=ParamTreeHandler(
-                    "/".join([self._api_prefix] + parameter.uri), allowed_values=allowed
+                handler=(
+                    handler if self._poll_workers is None else PollWorkerSender(handler)
                 ),
                 group=group,
             )
 
             setattr(self, parameter.name.replace(".", ""), attr)
+            self._attributes[handler.path] = self._leaves[leaf] = (handler, attr)
+            self._siblings[handler.path.rsplit("/", 1)[0]].append(handler)
+            if isinstance(handler, BatchedParamTreeHandler):
+                handler.poller.add(leaf, handler, attr)
+
+        if self._poll_workers is not None:
+            assert self._batch_depth is not None
+            for uri in dict.fromkeys(
+                tuple(leaf.uri[: self._batch_depth]) for leaf in self._leaves
+            ):
+                node = self._parameters.find(uri)
+                assert node is not None
+                self._poll_workers.add(self, "/".join([self._api_prefix, *uri]), node)
+
+    def get_leaf_attribute(
+        self, leaf: ParameterNode
+    ) -> tuple[ParamTreeHandler, AttrR[Any]] | None:
+        """Get the handler and attribute of the parameter of a leaf of the trie."""
+        return self._leaves.get(leaf)
+
+    def parameter_changed(self, handler: ParamTreeHandler) -> None:
+        """Poll the parameters next to a changed parameter at the update period.
+
+        Parameters in the same node tend to change together, e.g. when an
+        acquisition starts, so they should all be polled quickly.
+
+        """
+        for sibling in self._siblings[handler.path.rsplit("/", 1)[0]]:
+            sibling.reset_poll_period()
+
+    def apply_polling_profile(
+        self, profile: PollingProfile | None, watched: Collection[str] = ()
+    ) -> None:
+        """Set the poll periods of parameters from a polling profile.
+
+        Args:
+            profile: Profile to apply, or ``None`` to poll at the update period
+            watched: ``fnmatch`` patterns of URIs of parameters that select profiles.
+                These are always polled at the update period, so that a change of
+                profile is seen within one update period.
+
+        """
+        for path, (handler, _) in self._attributes.items():
+            uri = self._relative_uri(path)
+            handler.set_base_period(
+                profile.period(uri)
+                if profile and not any(fnmatchcase(uri, p) for p in watched)
+                else None
+            )
+
+    def get_attributes(self, patterns: list[str]) -> list[tuple[str, AttrR[Any]]]:
+        """Get the attributes of parameters with URIs matching any of the patterns.
+
+        Args:
+            patterns: ``fnmatch`` patterns of URIs within this controller
+
+        Returns: URI and attribute of each parameter
+
+        """
+        return [
+            (uri, attr)
+            for uri, attr in (
+                (self._relative_uri(path), attr)
+                for path, (_, attr) in self._attributes.items()
+            )
+            if any(fnmatchcase(uri, pattern) for pattern in patterns)
+        ]
+
+    def _relative_uri(self, path: str) -> str:
+        return path.removeprefix(f"{self._api_prefix}/")
+
+    def mark_stale(self) -> None:
+        """Set all attributes on their next poll, whether or not their values change.
+
+        This is called after the server has been down, as the attributes may not
+        show the current state of the restarted server.
+
+        """
+        for handler, _ in self._attributes.values():
+            handler._last_value = _UNSET
+            handler.reset_poll_period()
+
+    def demand(self, patterns: list[str], duration: float) -> int:
+        """Poll parameters with paths matching any of the patterns for a time.
+
+        Args:
+            patterns: ``fnmatch`` patterns of full API paths, e.g.
+                ``api/0.1/fp/*/status/hdf/*``
+            duration: Time to poll for in seconds, or ``math.inf`` to always poll
+
+        Returns: Number of parameters demanded
+
+        """
+        demanded = 0
+        for path, (handler, _) in self._attributes.items():
+            if any(fnmatchcase(path, pattern) for pattern in patterns):
+                handler.demand(duration)
+                demanded += 1
+
+        return demanded
+
+    def get_poll_periods(self) -> dict[str, float]:
+        """Current poll period of each parameter, by path."""
+        return {
+            path: handler.current_period
+            for path, (handler, _) in self._attributes.items()
+        }
+
+    async def update_poll_periods(self) -> None:
+        """Publish the distribution of the poll periods of the parameters.
+
+        Poll periods only vary if parameters are polled adaptively or lazily, so they
+        are only published in those modes.
+
+        """
+        if self._poll_period_attributes is not None:
+            await self._poll_period_attributes.update(
+                list(self.get_poll_periods().values())
+            )
+
+    def count_demanded(self) -> int:
+        """Number of parameters currently demanded."""
+        return sum(handler.demanded for handler, _ in self._attributes.values())
+
+    async def write_parameter(self, path: str, value: Any) -> None:
+        """Write a parameter, merged with other writes if there is a write window.
+
+        Args:
+            path: Full path of parameter
+            value: Value to write
+
+        Raises:
+            AdapterResponseError if the Odin server rejects the write
+
+        """
+        if self._writer is not None:
+            await self._writer.write(path, value)
+        else:
+            await self._put(path, value)
+
+    async def _put(self, path: str, value: Any) -> None:
+        response = await self._connection.put(path, value)
+        match response:
+            case {"error": error}:
+                raise AdapterResponseError(error)
+            case Mapping():
+                await self.update_from_response(path, response)
+
+    async def update_from_response(self, path: str, response: Mapping[str, Any]):
+        """Set attributes from the response to a request on a path in the tree.
+
+        Responses are nested under the final node of the request path, as for a GET,
+        so values in the response are matched to attributes relative to the parent of
+        the path. Values without an attribute are ignored.
+
+        Args:
+            path: Path the request was sent to
+            response: Response to the request
+
+        """
+        if path == self._api_prefix:
+            # Nested under the final node of the prefix, the root of the trie
+            node: ParameterNode | None = self._parameters
+            values = response.get(path.rsplit("/", 1)[-1])
+        else:
+            node = self._parameters.find(self._relative_uri(path).split("/")[:-1])
+            values = response
+
+        if node is None:
+            return
+
+        for leaf, value in node.iter_values(values):
+            if leaf in self._leaves:
+                handler, attr = self._leaves[leaf]
+                await handler._publish(self, attr, value)
+
+    def _create_handler(
+        self, parameter: OdinParameter, allowed_values: dict[int, str] | None
+    ) -> ParamTreeHandler:
+        path = "/".join([self._api_prefix] + parameter.uri)
+        # Status changes during acquisitions, so poll it ahead of config
+        priority = 1 if "status" in parameter.uri else 0
+        if self._batch_depth is None or self._poll_workers is not None:
+            return ParamTreeHandler(
+                path,
+                allowed_values=allowed_values,
+                heartbeat_period=self._heartbeat_period,
+                priority=priority,
+                max_update_period=self._max_update_period,
+                idle_period=self._idle_period,
+            )
+
+        poll_path = "/".join([self._api_prefix] + parameter.uri[: self._batch_depth])
+        if poll_path not in self._pollers:
+            node = self._parameters.find(parameter.uri[: self._batch_depth])
+            assert node is not None
+            self._pollers[poll_path] = ParamTreePoller(
+                self._connection,
+                poll_path,
+                max_age=ParamTreeHandler.update_period / 2,
+                node=node,
+            )
+
+        return BatchedParamTreeHandler(
+            path,
+            allowed_values=allowed_values,
+            heartbeat_period=self._heartbeat_period,
+            priority=priority,
+            max_update_period=self._max_update_period,
+            idle_period=self._idle_period,
+            poller=self._pollers[poll_path],
+        )
+
+
+class _PollPeriodAttributes:
+    """Attributes of the distribution of poll periods, added to a controller."""
+
+    def __init__(self, controller: OdinController):
+        self.poll_period_min = AttrR(Float(prec=1), group="PollPeriods")
+        self.poll_period_max = AttrR(Float(prec=1), group="PollPeriods")
+        self.poll_periods = AttrR(String(), group="PollPeriods")
+
+        for name, attr in vars(self).items():
+            setattr(controller, name, attr)
+
+    async def update(self, periods: list[float]) -> None:
+        if not periods:
+            return
+
+        await self.poll_period_min.set(min(periods))
+        await self.poll_period_max.set(max(periods))
+        # Number of parameters at each period, e.g. "0.2 s: 10, 1.6 s: 240"
+        await self.poll_periods.set(
+            ", ".join(
+                f"{period:g} s: {count}"
+                for period, count in sorted(Counter(periods).items())
+            )
+        )
+
+
+@dataclass
+class AdapterStartupTime:
+    """Time taken to introspect an adapter and create its controllers."""
+
+    fetch: float
+    """Time to get the parameter tree from the Odin server, in seconds."""
+    build: float
+    """Time to create the controllers from the parameter tree, in seconds."""
+
+    @property
+    def total(self) -> float:
+        return self.fetch + self.build
+
+
+class DemandSender:
+    """Demand the parameters matching whitespace separated patterns written to an
+    attribute of an ``OdinTopController``."""
+
+    async def put(
+        self, controller: "OdinTopController", attr: AttrW[str], value: str
+    ) -> None:
+        controller.demand(value.split())
 
 
 class OdinTopController(Controller):
     """
     Connects all sub controllers on connect
+
+    Args:
+        settings: IP and port of Odin server, with connection pool and timeout
+            settings if given as ``HTTPConnectionSettings``
+        batch_poll: Poll each indexed process subtree and each top level node of the
+            adapter trees with one request, rather than polling every parameter
+        introspection_concurrency: Maximum number of adapter parameter trees to
+            request from the Odin server at once during initialisation
+        cache_dir: Directory to cache adapter parameter trees in. If given and there
+            is a cache for the server, attributes are created from the cache and the
+            live trees are checked in the background once connected.
+        heartbeat_period: Period to set attributes at when their polled values have
+            not changed. If ``None``, only changed values are set.
+        write_window: Time to collect writes to each controller for and merge into a
+            single PUT, in seconds. If ``None``, each write is sent immediately.
+        max_update_period: Longest period to poll parameters at while they are not
+            changing. If ``None``, parameters are always polled at the update period.
+        polling_profiles: Profiles of poll periods to switch between depending on
+            the values of parameters, in order of precedence
+        scheduled_polling: Run all polls through one ``PollScheduler`` that spreads
+            them evenly across the update period, with status polls first
+        poll_budget: Maximum polls per second when ``scheduled_polling`` is enabled.
+            If ``None``, there is no limit.
+        template_indices: Create the parameters of the first indexed process subtree
+            of each adapter once and share them with the other indices with the same
+            structure, rather than creating them from the tree of every index
+        aggregates: Attributes to add to the controller of each adapter, aggregating
+            parameters across its indexed process subtrees
+        idle_period: Period to poll parameters at while there is no demand for them.
+            Parameters are demanded by writing to them, by ``demand``, which a
+            backend that tracks subscriptions can call, and by writing patterns to
+            ``demand_parameters``. Parameters used by polling profiles and
+            aggregates are always demanded. If ``None``, all parameters are always
+            polled.
+        prefix: Prefix for the paths of this controller and its sub controllers, to
+            run the controllers of several servers in one IOC
+        poll_workers: Number of worker processes to poll and decode the parameter
+            trees in, sharing the indexed process subtrees and top level nodes of the
+            adapters between them. Every parameter is polled at the update period and
+            only changed values are sent back to this process. If ``0``, parameters
+            are polled in this process.
+        introspect: Introspect the server on creation. If ``False``, ``initialise``
+            must be awaited before the controller is used, e.g. to introspect several
+            servers concurrently.
+
     """
 
     API_PREFIX = "api/0.1"
 
-    def __init__(self, settings: IPConnectionSettings) -> None:
+    published_updates = AttrR(Int())
+    suppressed_updates = AttrR(Int())
+    failed_updates = AttrR(Int())
+
+    def __init__(
+        self,
+        settings: IPConnectionSettings,
+        batch_poll: bool = False,
+        introspection_concurrency: int = 8,
+        cache_dir: Path | None = None,
+        heartbeat_period: float | None = None,
+        write_window: float | None = None,
+        max_update_period: float | None = None,
+        polling_profiles: list[PollingProfile] | None = None,
+        scheduled_polling: bool = False,
+        poll_budget: float | None = None,
+        template_indices: bool = False,
+        aggregates: list[Aggregate] | None = None,
+        idle_period: float | None = None,
+        prefix: str = "",
+        poll_workers: int = 0,
+        introspect: bool = True,
+    ) -> None:
         super().__init__()
+        self._path = [prefix] if prefix else []
 
-        self._connection = HTTPConnection(settings.ip, settings.port)
+        self._connection = HTTPConnection.from_settings(settings)
+        failure_threshold = (
+            settings.failure_threshold
+            if isinstance(settings, HTTPConnectionSettings)
+            else HTTPConnectionSettings.failure_threshold
+        )
+        # The connection is only ever disconnected if the circuit breaker is enabled
+        self._circuit_breaker = failure_threshold > 0
+        if self._circuit_breaker:
+            self.connected = AttrR(Bool())
+        self._batch_poll = batch_poll
+        self._introspection_concurrency = introspection_concurrency
+        self._heartbeat_period = heartbeat_period
+        self._write_window = write_window
+        self._max_update_period = max_update_period
+        if max_update_period is not None:
+            self.slowed_parameters = AttrR(Int())
+        self._polling_profiles = polling_profiles or []
+        if self._polling_profiles:
+            self.polling_profile = AttrR(String())
+        self._active_profile: PollingProfile | None = None
+        self._profile_applied = False
+        self._watched = [pattern for p in self._polling_profiles for pattern in p.when]
+        self._watched_attributes: list[tuple[str, AttrR[Any]]] = []
+        self._scheduler = PollScheduler(poll_budget) if scheduled_polling else None
+        if self._scheduler is not None:
+            self.missed_poll_deadlines = AttrR(Int())
+            self.queued_polls = AttrR(Int())
+        self._template_indices = template_indices
+        self._aggregates = aggregates or []
+        self._aggregate_updater = AggregateUpdater()
+        self._idle_period = idle_period
+        if idle_period is not None:
+            self.demanded_parameters = AttrR(Int())
+            self.demand_parameters = AttrW(String(), handler=DemandSender())
+        self._poll_worker_pool = (
+            PollWorkerPool(settings, poll_workers, ParamTreeHandler.update_period)
+            if poll_workers
+            else None
+        )
+        self._poll_workers_task: asyncio.Task | None = None
+        self._scheduler_task: asyncio.Task | None = None
+        self._circuit_trips = 0
+        self._connected = True
+        self._error_aggregator = ErrorAggregator()
+        self._cache = (
+            ParameterTreeCache(cache_dir, settings.ip, settings.port)
+            if cache_dir is not None
+            else None
+        )
+        self._cache_loaded = False
+        self._cache_check: asyncio.Task | None = None
+        self.startup_times: dict[str, AdapterStartupTime] = {}
 
-        asyncio.run(self.initialise())
+        if introspect:
+            asyncio.run(self.initialise())
 
     async def initialise(self) -> None:
-        self._connection.open()
+        start = time.monotonic()
+
+        cached_trees = self._cache.load() if self._cache is not None else None
+        if cached_trees is not None:
+            self._cache_loaded = True
+            adapters = list(cached_trees)
+            adapter_controllers = [
+                await self._build_adapter(adapter, _iter_items(tree))
+                for adapter, tree in cached_trees.items()
+            ]
+        else:
+            self._connection.open()
+            adapters = await self._get_adapters()
+
+            # Introspect adapters concurrently, creating the controllers for each
+            # adapter as soon as its tree arrives, while the others are pending
+            semaphore = asyncio.Semaphore(self._introspection_concurrency)
+            results = await asyncio.gather(
+                *[self._introspect_adapter(adapter, semaphore) for adapter in adapters]
+            )
+            await self._connection.close()
 
+            adapter_controllers = [controllers for _, controllers in results]
+            if self._cache is not None:
+                self._cache.save(
+                    {
+                        adapter: tree
+                        for adapter, (tree, _) in zip(adapters, results, strict=True)
+                    }
+                )
+
+        for controllers in adapter_controllers:
+            for controller in controllers:
+                self.register_sub_controller(controller)
+                if self._watched:
+                    self._watched_attributes += controller.get_attributes(self._watched)
+
+        for _, attr in self._watched_attributes:
+            if isinstance(attr.updater, ParamTreeHandler):
+                # Profiles must be switched within an update period of a change
+                attr.updater.max_update_period = None
+
+        if self._idle_period is not None:
+            # Parameters used by the controller itself must always be polled
+            for attr in [a for _, a in self._watched_attributes] + [
+                a for _, a in self._aggregate_updater.get_sources()
+            ]:
+                if isinstance(attr.updater, ParamTreeHandler):
+                    attr.updater.demand(math.inf)
+
+        self.register_sub_controller(
+            DiagnosticsController(
+                self._connection,
+                adapters,
+                self._error_aggregator,
+                self._sub_controller_path("DIAG"),
+            )
+        )
+
+        logging.info(
+            "Introspected %d adapters%s in %.3f s",
+            len(adapter_controllers),
+            " from cache" if self._cache_loaded else "",
+            time.monotonic() - start,
+        )
+
+    def _sub_controller_path(self, name: str) -> list[str]:
+        return [*self.path, name]
+
+    async def _get_adapters(self) -> list[str]:
         adapters_response = await self._connection.get(f"{self.API_PREFIX}/adapters")
         match adapters_response:
             case {"adapters": [*adapter_list]}:
-                adapters = tuple(a for a in adapter_list if isinstance(a, str))
+                adapters = [a for a in adapter_list if isinstance(a, str)]
                 if len(adapters) != len(adapter_list):
                     raise ValueError(f"Received invalid adapters list:\n{adapter_list}")
             case _:
@@ -143,47 +1129,374 @@ class OdinTopController(Controller):
                     f"Did not find valid adapters in response:\n{adapters_response}"
                 )
 
-        for adapter in adapters:
-            if adapter in IGNORED_ADAPTERS:
-                continue
+        return [adapter for adapter in adapters if adapter not in IGNORED_ADAPTERS]
 
-            # Get full parameter tree and split into parameters at the root and under
-            # an index where there are N identical trees for each underlying process
+    async def _fetch_adapter_tree(
+        self, adapter: str, semaphore: asyncio.Semaphore
+    ) -> Mapping[str, Any]:
+        async with semaphore:
             response = await self._connection.get(
                 f"{self.API_PREFIX}/{adapter}", headers=REQUEST_METADATA_HEADER
             )
-            assert isinstance(response, Mapping)
-            root_tree = {k: v for k, v in response.items() if not k.isdigit()}
-            indexed_trees = {
-                k: v
-                for k, v in response.items()
-                if k.isdigit() and isinstance(v, Mapping)
-            }
+
+        assert isinstance(response, Mapping)
+        return response
+
+    async def _introspect_adapter(
+        self, adapter: str, semaphore: asyncio.Semaphore
+    ) -> tuple[Mapping[str, Any], list[OdinController]]:
+        """Stream the parameter tree of an adapter and create its controllers.
+
+        Returns: The parameter tree if it is to be cached, else an empty tree, and the
+            controllers of the adapter
+
+        """
+        tree: dict[str, Any] = {}
+
+        async def fetch_items() -> AsyncIterator[tuple[str, Any]]:
+            async with semaphore:
+                async for key, value in self._connection.iter_items(
+                    f"{self.API_PREFIX}/{adapter}", headers=REQUEST_METADATA_HEADER
+                ):
+                    if self._cache is not None:
+                        tree[key] = value
+                    yield key, value
+
+        controllers = await self._build_adapter(adapter, fetch_items())
+
+        return tree, controllers
+
+    async def _build_adapter(
+        self, adapter: str, items: AsyncIterator[tuple[str, Any]]
+    ) -> list[OdinController]:
+        start = time.monotonic()
+        fetch_time = 0.0
+
+        async def timed_items() -> AsyncIterator[tuple[str, Any]]:
+            nonlocal fetch_time
+            while True:
+                fetch_start = time.monotonic()
+                try:
+                    item = await anext(items)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    fetch_time += time.monotonic() - fetch_start
+
+                yield item
+
+        controllers = await self._create_adapter_controllers(adapter, timed_items())
+
+        self.startup_times[adapter] = AdapterStartupTime(
+            fetch=fetch_time, build=time.monotonic() - start - fetch_time
+        )
+        logging.info(
+            "Introspected adapter %s in %.3f s (fetch %.3f s, build %.3f s)",
+            adapter,
+            self.startup_times[adapter].total,
+            self.startup_times[adapter].fetch,
+            self.startup_times[adapter].build,
+        )
+
+        return controllers
+
+    async def _create_adapter_controllers(
+        self, adapter: str, items: AsyncIterator[tuple[str, Any]]
+    ) -> list[OdinController]:
+        # Split parameter tree into parameters at the root and under an index where
+        # there are N identical trees for each underlying process. The controller of
+        # each process is created as soon as its tree arrives, so the trees of the
+        # other processes are not held while they are parsed.
+        root_tree: dict[str, Any] = {}
+        indexed_controllers: dict[str, OdinController] = {}
+
+        template: tuple[str, ParameterNode] | None = None
+        async for idx, tree in items:
+            if not idx.isdigit():
+                root_tree[idx] = tree
+                continue
+            elif not isinstance(tree, Mapping):
+                # Only subtrees are process trees, other indexed values are ignored
+                continue
+
+            parameters = None
+            if self._template_indices:
+                if template is None:
+                    template = (idx, create_parameter_trie(tree))
+                    parameters = template[1]
+                elif template[1].matches(tree):
+                    parameters = template[1]
+                else:
+                    logging.warning(
+                        "Parameter tree of %s/%s differs from %s/%s - "
+                        "creating its parameters separately",
+                        adapter,
+                        idx,
+                        adapter,
+                        template[0],
+                    )
 
             odin_controller = OdinController(
                 self._connection,
-                root_tree,
-                f"{self.API_PREFIX}/{adapter}",
-                f"{adapter.upper()}",
-            )
-            await odin_controller._create_parameter_tree()
-            self.register_sub_controller(odin_controller)
-
-            for idx, tree in indexed_trees.items():
-                odin_controller = OdinController(
-                    self._connection,
-                    tree,
-                    f"{self.API_PREFIX}/{adapter}/{idx}",
-                    f"{adapter.upper()}{idx}",
-                )
-                await odin_controller._create_parameter_tree()
-                self.register_sub_controller(odin_controller)
+                tree,
+                f"{self.API_PREFIX}/{adapter}/{idx}",
+                self._sub_controller_path(f"{adapter.upper()}{idx}"),
+                batch_depth=0 if self._batch_poll or self._poll_worker_pool else None,
+                heartbeat_period=self._heartbeat_period,
+                write_window=self._write_window,
+                max_update_period=self._max_update_period,
+                idle_period=self._idle_period,
+                poll_workers=self._poll_worker_pool,
+                scheduler=self._scheduler,
+                error_aggregator=self._error_aggregator,
+            )
+            await odin_controller._create_parameter_tree(parameters)
+            indexed_controllers[idx] = odin_controller
+
+        adapter_controller = OdinController(
+            self._connection,
+            root_tree,
+            f"{self.API_PREFIX}/{adapter}",
+            self._sub_controller_path(adapter.upper()),
+            batch_depth=1 if self._batch_poll or self._poll_worker_pool else None,
+            heartbeat_period=self._heartbeat_period,
+            write_window=self._write_window,
+            max_update_period=self._max_update_period,
+            idle_period=self._idle_period,
+            poll_workers=self._poll_worker_pool,
+            scheduler=self._scheduler,
+            error_aggregator=self._error_aggregator,
+        )
+        await adapter_controller._create_parameter_tree()
+
+        if self._aggregates and indexed_controllers:
+            self._aggregate_updater.add(
+                self._aggregates, adapter_controller, indexed_controllers
+            )
 
-        await self._connection.close()
+        return [adapter_controller, *indexed_controllers.values()]
 
     async def connect(self) -> None:
         self._connection.open()
 
+        if self._cache_loaded:
+            self._cache_check = asyncio.create_task(self._check_cache())
+        if self._scheduler is not None:
+            self._scheduler_task = asyncio.create_task(self._scheduler.run())
+        if self._poll_worker_pool is not None:
+            self._poll_worker_pool.start()
+            self._poll_workers_task = asyncio.create_task(self._poll_worker_pool.run())
+
+    async def close(self) -> None:
+        """Stop the background tasks and poller workers and close the connection.
+
+        The backends do not tear down controllers, so the poller workers are also
+        stopped at exit if this is not called.
+
+        """
+        tasks = [
+            task
+            for task in (
+                self._cache_check,
+                self._scheduler_task,
+                self._poll_workers_task,
+            )
+            if task is not None
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._cache_check = self._scheduler_task = self._poll_workers_task = None
+
+        if self._poll_worker_pool is not None:
+            self._poll_worker_pool.stop()
+        # The connection is not open if the controller has not connected
+        with contextlib.suppress(ConnectionRefusedError):
+            await self._connection.close()
+
+    def demand(self, patterns: list[str], duration: float = DEMAND_TIMEOUT) -> None:
+        """Poll parameters with paths matching any of the patterns for a time.
+
+        Args:
+            patterns: ``fnmatch`` patterns of paths relative to the API prefix, e.g.
+                ``fp/*/status/hdf/*``
+            duration: Time to poll for in seconds, or ``math.inf`` to always poll
+
+        """
+        full_patterns = [f"{self.API_PREFIX}/{pattern}" for pattern in patterns]
+        demanded = sum(
+            controller.demand(full_patterns, duration)
+            for controller in self.get_sub_controllers()
+            if isinstance(controller, OdinController)
+        )
+        logging.info("Demanded %d parameters matching %s", demanded, patterns)
+
+    @scan(1.0)
+    async def update_statistics(self) -> None:
+        controllers = [
+            controller
+            for controller in self.get_sub_controllers()
+            if isinstance(controller, OdinController)
+        ]
+        counters = [controller.update_counters for controller in controllers]
+
+        if self._circuit_breaker:
+            connected = self._connection.connected
+            trips = self._connection.stats.circuit_trips
+            if connected and (not self._connected or trips != self._circuit_trips):
+                for controller in controllers:
+                    controller.mark_stale()
+            self._connected = connected
+            self._circuit_trips = trips
+            await self.connected.set(connected)
+
+        await self.published_updates.set(sum(c.published for c in counters))
+        await self.suppressed_updates.set(sum(c.suppressed for c in counters))
+        await self.failed_updates.set(sum(c.failed for c in counters))
+
+        for controller in controllers:
+            await controller.update_poll_periods()
+
+        if self._max_update_period is not None:
+            await self.slowed_parameters.set(
+                sum(
+                    period > ParamTreeHandler.update_period
+                    for controller in controllers
+                    for period in controller.get_poll_periods().values()
+                )
+            )
+
+        if self._idle_period is not None:
+            await self.demanded_parameters.set(
+                sum(controller.count_demanded() for controller in controllers)
+            )
+
+        if self._scheduler is not None:
+            stats = self._scheduler.stats
+            if stats.missed_deadlines > self.missed_poll_deadlines.get():
+                logging.warning(
+                    "%d polls missed their deadline in the last second - "
+                    "poll budget is too small for update periods",
+                    stats.missed_deadlines - self.missed_poll_deadlines.get(),
+                )
+            await self.missed_poll_deadlines.set(stats.missed_deadlines)
+            await self.queued_polls.set(stats.queued)
+
+    @scan(ParamTreeHandler.update_period)
+    async def update_polling_profile(self) -> None:
+        """Switch to the polling profile selected by the watched parameters."""
+        if not self._polling_profiles:
+            return
+
+        profile = select_polling_profile(
+            self._polling_profiles,
+            [(uri, attr.get()) for uri, attr in self._watched_attributes],
+        )
+        if self._profile_applied and profile is self._active_profile:
+            return
+
+        for controller in self.get_sub_controllers():
+            if isinstance(controller, OdinController):
+                controller.apply_polling_profile(profile, self._watched)
+
+        name = profile.name if profile is not None else ""
+        logging.info("Switched to polling profile %s", name or "<default>")
+        self._active_profile = profile
+        self._profile_applied = True
+        await self.polling_profile.set(name)
+
+    @scan(ParamTreeHandler.update_period)
+    async def update_aggregates(self) -> None:
+        await self._aggregate_updater.update()
+
+    @scan(ERROR_SUMMARY_PERIOD)
+    async def summarise_errors(self) -> None:
+        self._error_aggregator.flush()
+
+    async def _check_cache(self) -> None:
+        """Compare the cached parameter trees with the live trees.
+
+        If the structure of any tree has changed, the cache is updated so that the
+        attributes are created from the live trees on the next start.
+
+        """
+        assert self._cache is not None
+
+        try:
+            adapters = await self._get_adapters()
+            semaphore = asyncio.Semaphore(self._introspection_concurrency)
+            trees = await asyncio.gather(
+                *[self._fetch_adapter_tree(adapter, semaphore) for adapter in adapters]
+            )
+        except Exception as e:
+            logging.error("Failed to check cached parameter trees:\n%s", e)
+            return
+
+        live_trees = dict(zip(adapters, trees, strict=True))
+        changed = sorted(
+            set(live_trees).symmetric_difference(self._cache.hashes)
+            | {
+                adapter
+                for adapter, tree in live_trees.items()
+                if tree_hash(tree) != self._cache.hashes.get(adapter)
+            }
+        )
+        if changed:
+            self._cache.save(live_trees)
+            logging.warning(
+                "Parameter trees of adapters %s differ from %s - updated the cache, "
+                "restart to update attributes",
+                changed,
+                self._cache.path,
+            )
+        else:
+            logging.info("Cached parameter trees are up to date")
+
+
+class OdinServersController(Controller):
+    """Controllers of several Odin servers, run on one event loop.
+
+    The servers are introspected concurrently, and each has its own connection pool
+    and its own prefix for the paths of its controllers.
+
+    Args:
+        servers: Settings of each server, by prefix
+        kwargs: Arguments for the ``OdinTopController`` of each server
+
+    """
+
+    def __init__(self, servers: dict[str, IPConnectionSettings], **kwargs: Any):
+        super().__init__()
+
+        self.servers = {
+            prefix: OdinTopController(
+                settings, prefix=prefix, introspect=False, **kwargs
+            )
+            for prefix, settings in servers.items()
+        }
+
+        asyncio.run(self.initialise())
+
+    async def initialise(self) -> None:
+        start = time.monotonic()
+        await asyncio.gather(*[server.initialise() for server in self.servers.values()])
+        for server in self.servers.values():
+            # Each server is a top controller of its own, but a sub controller here
+            self.register_sub_controller(server)
+
+        logging.info(
+            "Introspected %d servers in %.3f s",
+            len(self.servers),
+            time.monotonic() - start,
+        )
+
+    async def connect(self) -> None:
+        await asyncio.gather(*[server.connect() for server in self.servers.values()])
+
+    async def close(self) -> None:
+        """Close the controllers of all of the servers."""
+        await asyncio.gather(*[server.close() for server in self.servers.values()])
+
 
 class FPOdinController(OdinController):
     def __init__(
@@ -196,7 +1509,7 @@ class FPOdinController(OdinController):
             connection,
             param_tree,
             f"api/{api}/fp",
-            "FP",
+            ["FP"],
         )
 
 
@@ -211,7 +1524,7 @@ class FROdinController(OdinController):
             connection,
             param_tree,
             f"api/{api}/fr",
-            "FR",
+            ["FR"],
         )
 
 
@@ -226,5 +1539,5 @@ class MLOdinController(OdinController):
             connection,
             param_tree,
             f"api/{api}/meta_listener",
-            "ML",
+            ["ML"],
         )
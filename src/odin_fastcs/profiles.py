@@ -0,0 +1,112 @@
+import tomllib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class PollingProfile:
+    """Poll periods to use while the Odin server is in a particular state.
+
+    Parameters are matched by patterns on their URI within their controller, e.g.
+    ``status/hdf/*`` matches the HDF status parameters of each process.
+
+    """
+
+    name: str
+    update_period: float | None = None
+    """Period to poll parameters not matched by ``periods`` at, in seconds.
+
+    If ``None``, they are polled at the default update period.
+    """
+    periods: dict[str, float] = field(default_factory=dict)
+    """Period to poll parameters matching each pattern at, in seconds."""
+    when: dict[str, Any] = field(default_factory=dict)
+    """Values of parameters matching each pattern that select the profile.
+
+    The profile is selected if any parameter matching any pattern has the value. If
+    empty, the profile is selected when no other profile is.
+    """
+
+    def period(self, uri: str) -> float | None:
+        """Get the period to poll a parameter at under this profile.
+
+        Args:
+            uri: URI of the parameter within its controller
+
+        Returns: Period to poll at, or ``None`` for the default update period
+
+        """
+        for pattern, period in self.periods.items():
+            if fnmatchcase(uri, pattern):
+                return period
+
+        return self.update_period
+
+    def selected_by(self, values: Iterable[tuple[str, Any]]) -> bool:
+        """Check if the profile is selected by the values of watched parameters.
+
+        Args:
+            values: URI and value of each watched parameter
+
+        """
+        return any(
+            fnmatchcase(uri, pattern) and value == expected
+            for uri, value in values
+            for pattern, expected in self.when.items()
+        )
+
+
+def select_polling_profile(
+    profiles: list[PollingProfile], values: list[tuple[str, Any]]
+) -> PollingProfile | None:
+    """Select the first profile selected by the values of watched parameters.
+
+    Args:
+        profiles: Profiles in order of precedence
+        values: URI and value of each watched parameter
+
+    Returns: Selected profile, the first profile without conditions if no profile is
+        selected, or ``None`` if there is no such profile
+
+    """
+    for profile in profiles:
+        if profile.when and profile.selected_by(values):
+            return profile
+
+    return next((profile for profile in profiles if not profile.when), None)
+
+
+def load_polling_profiles(path: Path) -> list[PollingProfile]:
+    """Load polling profiles from a TOML file.
+
+    Each profile is a table under ``profiles``, in order of precedence, e.g.::
+
+        [profiles.acquiring]
+        when = { "status/hdf/writing" = true }
+        update_period = 1.0
+        periods = { "status/hdf/*" = 0.2 }
+
+        [profiles.idle]
+        update_period = 5.0
+
+    Args:
+        path: Path of file
+
+    Raises:
+        ValueError if the file does not define valid profiles
+
+    """
+    with path.open("rb") as f:
+        config = tomllib.load(f)
+
+    profiles: dict[str, Any] = config.get("profiles", {})
+    if not profiles:
+        raise ValueError(f"No [profiles] tables in {path}")
+
+    try:
+        return [PollingProfile(name, **profile) for name, profile in profiles.items()]
+    except TypeError as e:
+        raise ValueError(f"Invalid polling profile in {path}: {e}") from e
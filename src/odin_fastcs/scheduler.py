@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+
+Poll = Callable[[], Awaitable[None]]
+
+
+@dataclass
+class SchedulerStats:
+    """Statistics of a ``PollScheduler``."""
+
+    polls: int = 0
+    """Number of polls started."""
+    missed_deadlines: int = 0
+    """Number of polls not started within their period of being submitted."""
+    queued: int = 0
+    """Number of polls waiting to start."""
+    running: int = 0
+    """Number of polls started and not yet complete."""
+
+
+class PollScheduler:
+    """Run all polls of an Odin server, spread evenly in time within a request budget.
+
+    Polls are submitted once per period by their attribute updaters and queued. They
+    are started one at a time in priority order, with a delay after each, so that the
+    polls are spread evenly across their periods rather than all started at once.
+
+    If ``budget`` is set the delay is at least ``1 / budget``, limiting the rate of
+    polls. When the budget is too small for all polls to run in their period, the
+    lowest priority polls are delayed. A poll still waiting, or still running, when it
+    is submitted again has missed its deadline.
+
+    Args:
+        budget: Maximum polls to start per second. If ``None``, there is no limit.
+
+    """
+
+    def __init__(self, budget: float | None = None):
+        self._budget = budget
+        self._queue: list[tuple[int, int, Hashable]] = []
+        self._queued: dict[Hashable, tuple[Poll, float]] = {}
+        self._running: set[Hashable] = set()
+        self._periods: dict[Hashable, float] = {}
+        self._counter = itertools.count()
+        self._ready = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = SchedulerStats()
+
+    def submit(self, key: Hashable, poll: Poll, period: float, priority: int = 0):
+        """Queue a poll to be run within its period.
+
+        Submitting a poll with the same ``key`` again within half of ``period``, e.g.
+        from each of the attributes that share one request, is ignored.
+
+        Args:
+            key: Identifier of the poll
+            poll: Coroutine function to call to run the poll
+            period: Period the poll is submitted at, in seconds
+            priority: Polls with higher priority are started first
+
+        """
+        now = time.monotonic()
+        self._periods[key] = period
+
+        if key in self._queued:
+            _, release_time = self._queued[key]
+            if now - release_time >= period / 2:
+                self.stats.missed_deadlines += 1
+                self._queued[key] = (poll, now)
+            return
+        elif key in self._running:
+            self.stats.missed_deadlines += 1
+            return
+
+        self._queued[key] = (poll, now)
+        heapq.heappush(self._queue, (-priority, next(self._counter), key))
+        self.stats.queued = len(self._queued)
+        self._ready.set()
+
+    def interval(self) -> float:
+        """Delay between starting polls, in seconds.
+
+        This spreads the polls submitted so far evenly across their periods, limited
+        by the budget.
+
+        """
+        rate = sum(1 / period for period in self._periods.values())
+        if self._budget is not None:
+            rate = min(rate, self._budget)
+
+        return 1 / rate if rate > 0 else 0
+
+    async def run(self) -> None:
+        """Start queued polls until cancelled."""
+        while True:
+            await self._ready.wait()
+            _, _, key = heapq.heappop(self._queue)
+            poll, _ = self._queued.pop(key)
+            if not self._queue:
+                self._ready.clear()
+
+            self._running.add(key)
+            task = asyncio.create_task(self._run_poll(key, poll))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+            self.stats.polls += 1
+            self.stats.queued = len(self._queued)
+            self.stats.running = len(self._running)
+
+            await asyncio.sleep(self.interval())
+
+    async def _run_poll(self, key: Hashable, poll: Poll) -> None:
+        try:
+            await poll()
+        except Exception as e:
+            logging.error("Poll %s failed:\n%s", key, e)
+        finally:
+            self._running.discard(key)
+            self.stats.running = len(self._running)
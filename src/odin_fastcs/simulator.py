@@ -0,0 +1,321 @@
+import asyncio
+import copy
+import json
+import logging
+import random
+from dataclasses import dataclass
+from importlib.resources import files
+from typing import Any
+
+from aiohttp import web
+
+from odin_fastcs.util import get_uri_value, is_metadata_object
+
+API_PREFIX = "api/0.1"
+
+
+@dataclass
+class SimulatorSettings:
+    """Settings for an ``OdinSimulator``."""
+
+    processes: int = 1
+    """Number of processes under each adapter."""
+    adapters: tuple[str, ...] = ("fp", "fr", "ml")
+    """Names of adapters to serve."""
+    extra_parameters: int = 0
+    """Number of synthetic parameters to add to the status of each process."""
+    latency: float = 0.0
+    """Time to wait before responding to each request, in seconds."""
+    jitter: float = 0.0
+    """Maximum random time to add to ``latency``, in seconds."""
+    error_rate: float = 0.0
+    """Fraction of requests to respond to with an internal server error."""
+    seed: int | None = None
+    """Seed for the random jitter and errors."""
+
+
+def load_adapter_template() -> dict[str, Any]:
+    """Load the parameter tree of an odin-data adapter with one frameProcessor.
+
+    The tree is packaged with odin-fastcs as the template for simulated adapters.
+
+    Returns: Parameter tree with metadata
+
+    """
+    return json.loads(
+        (files("odin_fastcs") / "data" / "odin_data_adapter.json").read_text()
+    )
+
+
+def create_adapter_tree(processes: int, extra_parameters: int = 0) -> dict[str, Any]:
+    """Create the parameter tree of an odin-data adapter with a number of processes.
+
+    The tree is built from a parameter tree of an adapter with one frameProcessor,
+    copying the tree of that process for each process.
+
+    Args:
+        processes: Number of processes
+        extra_parameters: Number of synthetic parameters to add to the status of each
+            process, to simulate larger trees
+
+    Returns: Parameter tree with metadata
+
+    """
+    template = load_adapter_template()
+    process_template = template.pop("0")
+    endpoint_template = template["endpoints"][0]
+
+    tree = template
+    tree["count"]["value"] = processes
+    tree["endpoints"] = []
+    for idx in range(processes):
+        endpoint = copy.deepcopy(endpoint_template)
+        endpoint["port"]["value"] += 10 * idx
+        tree["endpoints"].append(endpoint)
+
+        process = copy.deepcopy(process_template)
+        process["status"]["hdf"]["rank"] = idx
+        process["config"]["hdf"]["process"]["rank"] = idx
+        if extra_parameters:
+            process["status"]["synthetic"] = {
+                f"parameter_{n}": 0 for n in range(extra_parameters)
+            }
+        tree[str(idx)] = process
+
+    return tree
+
+
+class OdinSimulator:
+    """Stand-in for an Odin server with odin-data adapters.
+
+    This serves the adapters list and GETs, with or without metadata, and PUTs of the
+    parameter trees of the adapters. Requests can be delayed and failed at random.
+
+    Args:
+        settings: Settings of the simulated server
+
+    """
+
+    def __init__(self, settings: SimulatorSettings | None = None):
+        self.settings = settings or SimulatorSettings()
+        self.trees = {
+            adapter: create_adapter_tree(
+                self.settings.processes, self.settings.extra_parameters
+            )
+            for adapter in self.settings.adapters
+        }
+        self.requests = 0
+        self.app = web.Application()
+        self.app.router.add_get(f"/{API_PREFIX}/adapters", self._get_adapters)
+        self.app.router.add_get(f"/{API_PREFIX}/{{adapter}}{{path:.*}}", self._get)
+        self.app.router.add_put(f"/{API_PREFIX}/{{adapter}}{{path:.*}}", self._put)
+        self._random = random.Random(self.settings.seed)
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8888) -> int:
+        """Start serving requests.
+
+        Args:
+            host: Host to listen on
+            port: Port to listen on, or 0 for any free port
+
+        Returns: Port the server is listening on
+
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        _, port = self._runner.addresses[0][:2]
+        logging.info(
+            "Simulating Odin server on %s:%d with %d processes per adapter",
+            host,
+            port,
+            self.settings.processes,
+        )
+        return port
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_value(self, adapter: str, uri: str) -> Any:
+        """Get the value of a parameter.
+
+        Args:
+            adapter: Name of adapter
+            uri: URI of parameter within the adapter tree
+
+        """
+        return strip_metadata(get_uri_value(self.trees[adapter], uri.split("/")))
+
+    def set_value(self, adapter: str, uri: str, value: Any) -> None:
+        """Set the value of a parameter, whether or not it is writeable.
+
+        Args:
+            adapter: Name of adapter
+            uri: URI of parameter within the adapter tree
+            value: New value
+
+        """
+        *parent, node_name = uri.split("/")
+        set_value(get_uri_value(self.trees[adapter], parent), node_name, value)
+
+    async def acquire(self, frames: int, frame_rate: float, adapter: str = "fp"):
+        """Simulate writing frames, shared between the processes of an adapter.
+
+        Sets ``status/hdf/writing`` of each process while frames are written, and
+        increments ``status/hdf/frames_written`` at the frame rate.
+
+        Args:
+            frames: Number of frames to write
+            frame_rate: Frames per second
+            adapter: Name of adapter
+
+        """
+        processes = [str(idx) for idx in range(self.settings.processes)]
+        for process in processes:
+            self.set_value(adapter, f"{process}/status/hdf/frames_written", 0)
+            self.set_value(adapter, f"{process}/status/hdf/writing", True)
+
+        for frame in range(frames):
+            await asyncio.sleep(1 / frame_rate)
+            process = processes[frame % len(processes)]
+            uri = f"{process}/status/hdf/frames_written"
+            self.set_value(adapter, uri, self.get_value(adapter, uri) + 1)
+
+        for process in processes:
+            self.set_value(adapter, f"{process}/status/hdf/writing", False)
+
+    async def _simulate_request(self) -> web.Response | None:
+        self.requests += 1
+        delay = self.settings.latency + self._random.uniform(0, self.settings.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self._random.random() < self.settings.error_rate:
+            return web.json_response({"error": "Simulated error"}, status=500)
+
+        return None
+
+    async def _get_adapters(self, request: web.Request) -> web.Response:
+        error = await self._simulate_request()
+        if error is not None:
+            return error
+
+        return web.json_response({"adapters": list(self.trees)})
+
+    async def _get(self, request: web.Request) -> web.Response:
+        error = await self._simulate_request()
+        if error is not None:
+            return error
+
+        try:
+            tree, uri = self._resolve(request)
+            node = get_uri_value(tree, uri)
+        except (KeyError, ValueError):
+            return _invalid_path(request)
+
+        if "metadata=true" not in request.headers.get("Accept", ""):
+            node = strip_metadata(node)
+
+        return web.json_response({uri[-1]: node} if uri else node)
+
+    async def _put(self, request: web.Request) -> web.Response:
+        error = await self._simulate_request()
+        if error is not None:
+            return error
+
+        try:
+            tree, uri = self._resolve(request)
+            parent = get_uri_value(tree, uri[:-1])
+            get_uri_value(parent, uri[-1:])
+        except (KeyError, ValueError, IndexError):
+            return _invalid_path(request)
+
+        value = await request.json()
+        if not _writeable(parent, uri, value):
+            return web.json_response(
+                {"error": f"Parameter {'/'.join(uri)} is not writeable"}, status=400
+            )
+
+        set_value(parent, uri[-1], value)
+        return web.json_response(
+            {uri[-1]: strip_metadata(get_uri_value(parent, uri[-1:]))}
+        )
+
+    def _resolve(self, request: web.Request) -> tuple[Any, list[str]]:
+        tree = self.trees[request.match_info["adapter"]]
+        uri = [node for node in request.match_info["path"].split("/") if node]
+        return tree, uri
+
+
+def run_simulator(
+    settings: SimulatorSettings, host: str = "127.0.0.1", port: int = 8888
+) -> None:
+    """Run an ``OdinSimulator`` until interrupted."""
+
+    async def serve():
+        simulator = OdinSimulator(settings)
+        await simulator.start(host, port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await simulator.stop()
+
+    asyncio.run(serve())
+
+
+def _invalid_path(request: web.Request) -> web.Response:
+    return web.json_response({"error": f"Invalid path: {request.path}"}, status=400)
+
+
+def _writeable(parent: Any, uri: list[str], value: Any) -> bool:
+    node = get_uri_value(parent, uri[-1:])
+    if is_metadata_object(node):
+        return node["writeable"]
+    elif isinstance(value, dict) and isinstance(node, dict):
+        return all(
+            name in node and _writeable(node, uri + [name], child_value)
+            for name, child_value in value.items()
+        )
+    else:
+        # Parameters without metadata are writeable under config
+        return "config" in uri
+
+
+def set_value(parent: Any, node_name: str, value: Any) -> None:
+    """Set the value of a node of a parameter tree with metadata.
+
+    Values of parameters with metadata are set in their metadata, and dicts of values
+    are set recursively, so a tree of values can be set on a tree with metadata.
+
+    Args:
+        parent: Parent of node
+        node_name: Name of node in ``parent``, or index if ``parent`` is a list
+        value: Value to set
+
+    """
+    match parent:
+        case list():
+            parent[int(node_name)] = value
+        case _ if is_metadata_object(parent[node_name]):
+            parent[node_name]["value"] = value
+        case _ if isinstance(value, dict):
+            for child_name, child_value in value.items():
+                set_value(parent[node_name], child_name, child_value)
+        case _:
+            parent[node_name] = value
+
+
+def strip_metadata(tree: Any) -> Any:
+    """Get the values of a parameter tree with metadata, as returned by a GET."""
+    match tree:
+        case dict() if is_metadata_object(tree):
+            return tree["value"]
+        case dict():
+            return {k: strip_metadata(v) for k, v in tree.items()}
+        case list():
+            return [strip_metadata(v) for v in tree]
+        case _:
+            return tree
@@ -1,4 +1,8 @@
-from collections.abc import Iterator, Mapping
+import hashlib
+import json
+import logging
+import sys
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
 from typing import Any
 
@@ -31,55 +35,175 @@ def create_odin_parameters(metadata: Mapping[str, Any]) -> list[OdinParameter]:
 
     """
     return [
-        OdinParameter(uri=uri, metadata=metadata)
-        for uri, metadata in _walk_odin_metadata(metadata, [])
+        OdinParameter(uri=node.uri, metadata=node.metadata)  # type: ignore
+        for node in create_parameter_trie(metadata).leaves()
     ]
 
 
-def _walk_odin_metadata(
-    tree: Mapping[str, Any], path: list[str]
-) -> Iterator[tuple[list[str], dict[str, Any]]]:
-    """Walk through tree and yield the leaves and their paths.
+class ParameterNode:
+    """Node of a trie of the parameters in an Odin parameter tree.
+
+    Leaves are parameters and have ``metadata``. Other nodes have ``children``. Node
+    names are interned, so the names repeated in each process subtree are shared. A
+    trie is not modified once created, so it can be shared by controllers of trees
+    with the same structure, which key their attributes by leaf.
+
+    """
+
+    __slots__ = ("name", "parent", "children", "metadata")
+
+    def __init__(self, name: str, parent: "ParameterNode | None" = None):
+        self.name = name
+        self.parent = parent
+        self.children: dict[str, ParameterNode] = {}
+        self.metadata: dict[str, Any] | None = None
+
+    @property
+    def uri(self) -> list[str]:
+        """URI of the node from the root of the trie."""
+        uri = []
+        node: ParameterNode | None = self
+        while node is not None and node.parent is not None:
+            uri.append(node.name)
+            node = node.parent
+
+        return uri[::-1]
+
+    def child(self, name: str) -> "ParameterNode":
+        """Get a child node, creating it if it does not exist."""
+        if name not in self.children:
+            self.children[name] = ParameterNode(sys.intern(name), self)
+
+        return self.children[name]
+
+    def find(self, uri: Iterable[str]) -> "ParameterNode | None":
+        """Find the node at a URI relative to this node.
+
+        Returns: The node, or ``None`` if there is no node at ``uri``
+
+        """
+        node = self
+        for name in uri:
+            if name not in node.children:
+                return None
+            node = node.children[name]
+
+        return node
+
+    def leaves(self) -> Iterator["ParameterNode"]:
+        """Iterate over the leaves under this node, in the order of the tree."""
+        if self.metadata is not None:
+            yield self
+
+        for child in self.children.values():
+            yield from child.leaves()
+
+    def iter_values(self, value: Any) -> Iterator[tuple["ParameterNode", Any]]:
+        """Match the values in a JSON response to the leaves under this node.
+
+        Args:
+            value: Value of this node in a response
+
+        Returns: Leaf and its value for each leaf in the response
+
+        """
+        if self.metadata is not None:
+            yield self, value
+        elif isinstance(value, Mapping):
+            for name, child_value in value.items():
+                if name in self.children:
+                    yield from self.children[name].iter_values(child_value)
+        elif isinstance(value, list):
+            for idx, child_value in enumerate(value):
+                if str(idx) in self.children:
+                    yield from self.children[str(idx)].iter_values(child_value)
+
+    def matches(self, tree: Mapping[str, Any]) -> bool:
+        """Check if a parameter tree has the same structure as the tree of this trie.
+
+        Trees match if they have the parameters of the leaves under this node, with
+        the same types, write access and allowed values. Values may differ.
+
+        Args:
+            tree: JSON metadata from Odin server
+
+        """
+        leaves = self.leaves()
+        for uri, metadata in iter_odin_leaves(tree):
+            leaf = next(leaves, None)
+            if (
+                leaf is None
+                or leaf.uri != uri
+                or _structure(leaf.metadata) != _structure(metadata)  # type: ignore
+            ):
+                return False
+
+        return next(leaves, None) is None
+
+
+def create_parameter_trie(metadata: Mapping[str, Any]) -> ParameterNode:
+    """Create a trie of the parameters in a parameter tree in one pass.
 
     Args:
-        tree: Tree to walk
-        path: Path down tree so far
+        metadata: JSON metadata from Odin server
 
     Returns:
-        (path to leaf, value of leaf)
+        Root node of the trie
+
+    """
+    root = ParameterNode("")
+    for uri, leaf_metadata in iter_odin_leaves(metadata):
+        node = root
+        for node_name in uri:
+            node = node.child(node_name)
+        node.metadata = leaf_metadata
+
+    return root
+
+
+def iter_odin_leaves(
+    tree: Mapping[str, Any], uri: list[str] | None = None, config: bool = False
+) -> Iterator[tuple[list[str], dict[str, Any]]]:
+    """Walk through tree and yield the URI and metadata of the leaves.
+
+    Args:
+        tree: Tree to walk
+        uri: URI of ``tree``
+        config: Whether ``tree`` is under a config node
 
     """
+    uri = uri or []
     for node_name, node_value in tree.items():
-        if node_name:
-            node_path = path + [node_name]
+        node_uri = uri + [node_name] if node_name else uri
+        node_config = config or node_name == "config"
 
         if isinstance(node_value, dict) and not is_metadata_object(node_value):
-            yield from _walk_odin_metadata(node_value, node_path)
+            yield from iter_odin_leaves(node_value, node_uri, node_config)
         elif isinstance(node_value, list) and all(
             isinstance(m, dict) for m in node_value
         ):
             for idx, sub_node in enumerate(node_value):
-                sub_node_path = node_path + [str(idx)]
-                yield from _walk_odin_metadata(sub_node, sub_node_path)
+                yield from iter_odin_leaves(
+                    sub_node, node_uri + [str(idx)], node_config
+                )
         else:
             # Leaves
             if is_metadata_object(node_value):
-                yield (node_path, node_value)
+                yield node_uri, node_value
             elif isinstance(node_value, list):
-                if "config" in node_path:
+                if node_config:
                     # Split list into separate parameters so they can be set
                     for idx, sub_node_value in enumerate(node_value):
-                        sub_node_path = node_path + [str(idx)]
                         yield (
-                            sub_node_path,
-                            infer_metadata(sub_node_value, sub_node_path),
+                            node_uri + [str(idx)],
+                            _metadata(sub_node_value, writeable=True),
                         )
                 else:
                     # Convert read-only list to a string for display
-                    yield (node_path, infer_metadata(str(node_value), node_path))
+                    yield node_uri, _metadata(str(node_value), writeable=False)
             else:
                 # TODO: This won't be needed when all parameters provide metadata
-                yield (node_path, infer_metadata(node_value, node_path))
+                yield node_uri, _metadata(node_value, writeable=node_config)
 
 
 def infer_metadata(parameter: int | float | bool | str, uri: list[str]):
@@ -90,8 +214,88 @@ def infer_metadata(parameter: int | float | bool | str, uri: list[str]):
         uri: URI of parameter in API
 
     """
+    return _metadata(parameter, writeable="config" in uri)
+
+
+def _metadata(parameter: int | float | bool | str, writeable: bool) -> dict[str, Any]:
     return {
         "value": parameter,
         "type": type(parameter).__name__,
-        "writeable": "config" in uri,
+        "writeable": writeable,
     }
+
+
+def get_uri_value(tree: Any, uri: Sequence[str]) -> Any:
+    """Get the value at a URI within a JSON response from an Odin server.
+
+    Args:
+        tree: JSON response to look in
+        uri: Path to value relative to the root of ``tree``
+
+    Returns:
+        Value at ``uri``
+
+    Raises:
+        ValueError if ``uri`` is not in ``tree``
+
+    """
+    node = tree
+    for segment in uri:
+        match node:
+            case Mapping() if segment in node:
+                node = node[segment]
+            case list() if segment.isdigit() and int(segment) < len(node):
+                node = node[int(segment)]
+            case _:
+                logging.debug("%s not found in response:\n%s", "/".join(uri), tree)
+                raise ValueError("Parameter not found in response")
+
+    return node
+
+
+def get_response_subtree(path: str, response: Any) -> Any:
+    """Get the subtree at a path from the response to a GET of the path.
+
+    Responses are nested under the final node of the path, except for requests on the
+    root of an adapter, which return the whole tree.
+
+    Args:
+        path: Path the request was sent to
+        response: JSON response from Odin server
+
+    """
+    node = path.split("/")[-1]
+    match response:
+        case {**tree} if len(tree) == 1 and node in tree:
+            return tree[node]
+        case _:
+            return response
+
+
+def parameter_tree_hash(parameters: Iterable[OdinParameter]) -> str:
+    """Create a hash of the structure of a parameter tree.
+
+    The hash depends only on the parameters that would be created from the tree and
+    their types, not the current values, so it changes only if the attributes created
+    for the tree would change.
+
+    Args:
+        parameters: Parameters created from the tree
+
+    Returns:
+        Hex digest of the structure of the tree
+
+    """
+    structure = [
+        (parameter.uri, *_structure(parameter.metadata)) for parameter in parameters
+    ]
+    return hashlib.sha256(json.dumps(structure).encode()).hexdigest()
+
+
+def _structure(metadata: Mapping[str, Any]) -> tuple[Any, ...]:
+    """Parts of the metadata of a parameter that determine its attribute."""
+    return (
+        metadata["type"],
+        metadata.get("writeable", False),
+        metadata.get("allowed_values", None),
+    )
@@ -0,0 +1,266 @@
+import asyncio
+import atexit
+import logging
+import multiprocessing
+import time
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import TYPE_CHECKING, Any
+
+from fastcs.attributes import AttrR
+from fastcs.connections.ip_connection import IPConnectionSettings
+
+from odin_fastcs.http_connection import CircuitOpenError, HTTPConnection
+from odin_fastcs.util import ParameterNode, get_response_subtree
+
+if TYPE_CHECKING:
+    from odin_fastcs.odin_controller import OdinController, ParamTreeHandler
+
+
+class PollWorkerError(Exception):
+    """Error polling a subtree in a poller worker process."""
+
+
+@dataclass
+class PollShard:
+    """Subtrees polled by one worker process.
+
+    Leaves are identified by an integer id shared with the main process, so that
+    updates can be sent back as ``(id, value)`` pairs.
+
+    """
+
+    paths: list[str] = field(default_factory=list)
+    """Paths of the subtrees to poll."""
+    leaves: list[list[tuple[list[str], int]]] = field(default_factory=list)
+    """URI relative to the subtree and id of each leaf of each subtree."""
+
+    @property
+    def size(self) -> int:
+        return sum(len(leaves) for leaves in self.leaves)
+
+
+WorkerMessage = tuple[list[tuple[int, Any]], list[tuple[str, str]]]
+"""Changed ``(id, value)`` pairs and ``(path, error)`` pairs from one poll."""
+
+
+class PollWorkerPool:
+    """Poll subtrees of parameter trees in a pool of worker processes.
+
+    Subtrees are shared between the workers, balanced by number of parameters. Each
+    worker polls its subtrees with its own connection, decodes the responses and
+    sends the values that have changed back over a pipe, so only setting attributes
+    is left to this process.
+
+    A worker that stops is reported as an error of its subtrees, which are marked
+    stale, and restarted after ``RESTART_DELAY``. The workers are stopped at exit if
+    ``stop`` has not been called.
+
+    Args:
+        settings: Settings of connection to Odin server
+        workers: Number of worker processes
+        period: Period to poll subtrees at, in seconds
+
+    """
+
+    RESTART_DELAY = 1.0
+    """Time to wait before restarting a worker that has stopped, in seconds."""
+
+    def __init__(self, settings: IPConnectionSettings, workers: int, period: float):
+        self._settings = settings
+        self._period = period
+        self._shards = [PollShard() for _ in range(workers)]
+        self._targets: list[tuple[OdinController, ParamTreeHandler, AttrR[Any]]] = []
+        self._controllers: dict[str, OdinController] = {}
+        self._workers: dict[int, tuple[BaseProcess, Connection]] = {}
+        self._stopped = False
+        self.restarts = 0
+        """Number of workers restarted after stopping unexpectedly."""
+
+    def add(self, controller: "OdinController", path: str, node: ParameterNode) -> None:
+        """Add a subtree of a controller to poll.
+
+        Args:
+            controller: Controller with the attributes of the parameters of the subtree
+            path: Path of the subtree
+            node: Node of the subtree in the trie of parameters of ``controller``
+
+        """
+        depth = len(node.uri)
+        leaves = []
+        for leaf in node.leaves():
+            target = controller.get_leaf_attribute(leaf)
+            if target is not None:
+                leaves.append((leaf.uri[depth:], len(self._targets)))
+                self._targets.append((controller, *target))
+
+        self._controllers[path] = controller
+        shard = min(self._shards, key=lambda shard: shard.size)
+        shard.paths.append(path)
+        shard.leaves.append(leaves)
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        self._stopped = False
+        for idx, shard in enumerate(self._shards):
+            if shard.paths:
+                self._start_worker(idx)
+        atexit.register(self.stop)
+
+        logging.info(
+            "Started %d poller workers for %d parameters",
+            len(self._workers),
+            len(self._targets),
+        )
+
+    def _start_worker(self, idx: int) -> None:
+        context = multiprocessing.get_context("spawn")
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=run_poll_worker,
+            args=(self._settings, self._shards[idx], self._period, sender),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        self._workers[idx] = (process, receiver)
+
+    async def run(self) -> None:
+        """Apply the updates sent by the workers, restarting workers that stop."""
+        await asyncio.gather(*[self._run_worker(idx) for idx in list(self._workers)])
+
+    def stop(self) -> None:
+        """Stop the worker processes."""
+        self._stopped = True
+        atexit.unregister(self.stop)
+        for process, _ in self._workers.values():
+            process.terminate()
+        for process, pipe in self._workers.values():
+            process.join()
+            pipe.close()
+
+        self._workers.clear()
+
+    async def _run_worker(self, idx: int) -> None:
+        while not self._stopped:
+            _, pipe = self._workers[idx]
+            await self._receive(pipe)
+            if self._stopped:
+                return
+
+            self._worker_stopped(idx)
+            await asyncio.sleep(self.RESTART_DELAY)
+            if self._stopped:
+                return
+
+            process, pipe = self._workers[idx]
+            process.join()
+            pipe.close()
+            self._start_worker(idx)
+            self.restarts += 1
+
+    def _worker_stopped(self, idx: int) -> None:
+        """Report the subtrees of a stopped worker and mark their attributes stale."""
+        process, _ = self._workers[idx]
+        error = PollWorkerError(
+            f"Poller worker stopped with exit code {process.exitcode}, restarting"
+        )
+        for path in self._shards[idx].paths:
+            controller = self._controllers[path]
+            controller.error_aggregator.report("Update", path, error)
+            controller.mark_stale()
+
+    async def _receive(self, pipe: Connection) -> None:
+        """Apply the updates sent over a pipe until the worker closes it."""
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fd = pipe.fileno()
+        loop.add_reader(fd, readable.set)
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                while pipe.poll():
+                    try:
+                        updates, errors = pipe.recv()
+                    except (EOFError, OSError):
+                        return
+
+                    await self._apply(updates, errors)
+        finally:
+            loop.remove_reader(fd)
+
+    async def _apply(
+        self, updates: list[tuple[int, Any]], errors: list[tuple[str, str]]
+    ) -> None:
+        for leaf_id, value in updates:
+            controller, handler, attr = self._targets[leaf_id]
+            await handler._publish(controller, attr, value)
+
+        for path, error in errors:
+            controller = self._controllers[path]
+            controller.update_counters.failed += 1
+            controller.error_aggregator.report("Update", path, PollWorkerError(error))
+
+
+def run_poll_worker(
+    settings: IPConnectionSettings, shard: PollShard, period: float, pipe: Connection
+) -> None:
+    """Poll the subtrees of a shard, sending changed values over a pipe."""
+    try:
+        asyncio.run(_poll_shard(settings, shard, period, pipe))
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+async def _poll_shard(
+    settings: IPConnectionSettings, shard: PollShard, period: float, pipe: Connection
+) -> None:
+    connection = HTTPConnection.from_settings(settings)
+    connection.open()
+
+    subtrees = []
+    for leaves in shard.leaves:
+        node = ParameterNode("")
+        ids = {}
+        for uri, leaf_id in leaves:
+            leaf = node
+            for name in uri:
+                leaf = leaf.child(name)
+            leaf.metadata = {}
+            ids[leaf] = leaf_id
+        subtrees.append((node, ids))
+
+    parent = multiprocessing.parent_process()
+    last_values: dict[int, Any] = {}
+    while parent is None or parent.is_alive():
+        start = time.monotonic()
+        responses = await asyncio.gather(
+            *[connection.get(path) for path in shard.paths], return_exceptions=True
+        )
+
+        message: WorkerMessage = ([], [])
+        for path, (node, ids), response in zip(
+            shard.paths, subtrees, responses, strict=True
+        ):
+            if isinstance(response, BaseException):
+                # The server is down and its recovery is logged by the connection
+                if not isinstance(response, CircuitOpenError):
+                    error = f"{type(response).__name__}: {response}"
+                    message[1].append((path, error))
+                # Send every value again once the subtree can be polled
+                for leaf_id in ids.values():
+                    last_values.pop(leaf_id, None)
+                continue
+
+            for leaf, value in node.iter_values(get_response_subtree(path, response)):
+                leaf_id = ids[leaf]
+                if leaf_id not in last_values or last_values[leaf_id] != value:
+                    last_values[leaf_id] = value
+                    message[0].append((leaf_id, value))
+
+        if message[0] or message[1]:
+            pipe.send(message)
+
+        await asyncio.sleep(max(0.0, period - (time.monotonic() - start)))
@@ -1,6 +1,17 @@
+import asyncio
 import os
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
 
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from odin_fastcs.http_connection import ConnectionStats
+from odin_fastcs.simulator import load_adapter_template, set_value, strip_metadata
+from odin_fastcs.util import get_uri_value
+
+API_PREFIX = "api/0.1"
 
 # Prevent pytest from catching exceptions when debugging in vscode so that break on
 # exception works correctly (see: https://github.com/pytest-dev/pytest/issues/7409)
@@ -13,3 +24,106 @@ if os.getenv("PYTEST_RAISE", "0") == "1":
     @pytest.hookimpl(tryfirst=True)
     def pytest_internalerror(excinfo):
         raise excinfo.value
+
+
+class DummyConnection:
+    """Stand-in for ``HTTPConnection`` serving static adapter parameter trees.
+
+    Requests are recorded in ``requests`` and each takes ``latency`` seconds. PUTs to
+    any of the paths in ``errors`` return an error. ``connected`` and ``stats`` are
+    set by tests to simulate the server going down.
+
+    """
+
+    def __init__(self, adapters: dict[str, dict[str, Any]], latency: float = 0):
+        self.adapters = adapters
+        self.latency = latency
+        self.requests: list[str] = []
+        self.errors: set[str] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connected = True
+        self.stats = ConnectionStats()
+
+    def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def _request(self, uri: str) -> tuple[str, list[str]]:
+        self.requests.append(uri)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        adapter, *path = uri.removeprefix(f"{API_PREFIX}/").split("/")
+        return adapter, path
+
+    async def get(self, uri: str, headers: dict | None = None) -> dict[str, Any]:
+        adapter, path = await self._request(uri)
+        if adapter == "adapters":
+            return {"adapters": list(self.adapters)}
+
+        tree = self.adapters[adapter]
+        if headers is None:
+            tree = strip_metadata(tree)
+
+        if not path:
+            return tree
+
+        return {path[-1]: get_uri_value(tree, path)}
+
+    async def iter_items(
+        self, uri: str, headers: dict | None = None
+    ) -> AsyncIterator[tuple[str, Any]]:
+        for item in (await self.get(uri, headers)).items():
+            yield item
+
+    async def put(self, uri: str, value: Any) -> dict[str, Any]:
+        adapter, path = await self._request(uri)
+        if self.errors.intersection(iter_leaf_paths(uri, value)):
+            return {"error": f"Invalid put to {uri}"}
+
+        tree = self.adapters[adapter]
+        set_value(get_uri_value(tree, path[:-1]), path[-1], value)
+        return {path[-1]: strip_metadata(get_uri_value(tree, path))}
+
+
+async def start_server(
+    delay: float, port: int | None = None, response: Any = None
+) -> TestServer:
+    """Start an HTTP server that responds to every GET with the same JSON.
+
+    Args:
+        delay: Time to wait before each response, in seconds
+        port: Port to serve on, or ``None`` for any free port
+        response: JSON to respond with, or ``None`` for ``{"value": 1}``
+
+    """
+
+    async def handler(request: web.Request) -> web.Response:
+        await asyncio.sleep(delay)
+        return web.json_response({"value": 1} if response is None else response)
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    server = TestServer(app, port=port)
+    await server.start_server()
+    return server
+
+
+def iter_leaf_paths(path: str, value: Any) -> Iterator[str]:
+    if isinstance(value, dict):
+        for node_name, node_value in value.items():
+            yield from iter_leaf_paths(f"{path}/{node_name}", node_value)
+    else:
+        yield path
+
+
+@pytest.fixture
+def fp_response() -> dict[str, Any]:
+    return load_adapter_template()
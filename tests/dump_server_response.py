@@ -27,6 +27,7 @@ def main(
     else:
         adapters = requests.get(f"{url}/api/0.1/adapters").json()["adapters"]
 
+    output.mkdir(parents=True, exist_ok=True)
     for adapter in adapters:
         if adapter in IGNORED_ADAPTERS:
             continue
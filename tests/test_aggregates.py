@@ -0,0 +1,85 @@
+import asyncio
+import copy
+
+import pytest
+from fastcs.connections.ip_connection import IPConnectionSettings
+from fastcs.datatypes import Bool, Float, Int
+
+from conftest import DummyConnection
+from odin_fastcs import odin_controller
+from odin_fastcs.aggregates import Aggregate, parse_aggregate
+from odin_fastcs.odin_controller import OdinTopController
+
+
+def test_parse_aggregate():
+    aggregate = parse_aggregate("*/status/hdf/frames_written -> sum")
+    assert aggregate == Aggregate("*/status/hdf/frames_written", "sum")
+    assert aggregate.name == "status_hdf_frames_written_sum"
+
+    for declaration in ["*/status/hdf/frames_written", "-> sum", "*/a -> median"]:
+        with pytest.raises(ValueError, match="Invalid aggregate"):
+            parse_aggregate(declaration)
+
+
+def test_aggregates(monkeypatch, fp_response):
+    for idx in ["1", "2"]:
+        fp_response[idx] = copy.deepcopy(fp_response["0"])
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+
+    controller = OdinTopController(
+        IPConnectionSettings("127.0.0.1", 8888),
+        aggregates=[
+            parse_aggregate("*/status/hdf/frames_written -> sum"),
+            parse_aggregate("*/status/hdf/frames_processed -> min"),
+            parse_aggregate("*/status/hdf/frames_processed -> max"),
+            parse_aggregate("[01]/status/hdf/frames_processed -> mean"),
+            parse_aggregate("*/status/hdf/writing -> any"),
+            parse_aggregate("*/status/hdf/file_name -> sum"),
+        ],
+    )
+    fp, *processes = controller.get_sub_controllers()[:4]
+
+    async def update(frames: list[int], writing: list[bool]):
+        for process, n, w in zip(processes, frames, writing, strict=True):
+            await process.status_hdf_frames_written.set(n)  # type: ignore
+            await process.status_hdf_frames_processed.set(n)  # type: ignore
+            await process.status_hdf_writing.set(w)  # type: ignore
+        await controller.update_aggregates()
+
+    asyncio.run(update([1, 2, 6], [False, True, False]))
+    assert fp.status_hdf_frames_written_sum.get() == 9  # type: ignore
+    assert fp.status_hdf_frames_processed_min.get() == 1  # type: ignore
+    assert fp.status_hdf_frames_processed_max.get() == 6  # type: ignore
+    assert fp.status_hdf_frames_processed_mean.get() == 1.5  # type: ignore
+    assert fp.status_hdf_writing_any.get() is True  # type: ignore
+
+    assert isinstance(fp.status_hdf_frames_written_sum.datatype, Int)  # type: ignore
+    assert isinstance(fp.status_hdf_frames_processed_mean.datatype, Float)  # type: ignore
+    assert isinstance(fp.status_hdf_writing_any.datatype, Bool)  # type: ignore
+    # Strings cannot be aggregated
+    assert not hasattr(fp, "status_hdf_file_name_sum")
+
+
+def test_aggregate_sources_always_demanded(monkeypatch, fp_response):
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+
+    controller = OdinTopController(
+        IPConnectionSettings("127.0.0.1", 8888),
+        aggregates=[parse_aggregate("*/status/hdf/frames_written -> sum")],
+        idle_period=5.0,
+    )
+    fp0 = controller.get_sub_controllers()[1]
+    assert isinstance(fp0, odin_controller.OdinController)
+    assert fp0.count_demanded() == 1
+
+    attr = controller.demand_parameters
+    asyncio.run(attr.sender.put(controller, attr, "fp/0/config/hdf/* fp/0/missing"))  # type: ignore
+    assert fp0.count_demanded() > 1
+    assert fp0.get_poll_periods()["api/0.1/fp/0/status/hdf/writing"] == 5.0
+    assert fp0.get_poll_periods()["api/0.1/fp/0/config/hdf/frames"] == 0.2
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+import pytest
+from fastcs.connections.ip_connection import IPConnectionSettings
+
+from conftest import DummyConnection
+from odin_fastcs import odin_controller
+from odin_fastcs.odin_controller import OdinTopController
+
+SETTINGS = IPConnectionSettings("127.0.0.1", 8888)
+
+
+@pytest.fixture
+def connection(monkeypatch, fp_response) -> DummyConnection:
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+    return connection
+
+
+def sub_controller_attributes(controller: OdinTopController) -> dict[str, list[str]]:
+    return {
+        str(sub_controller.path): sorted(vars(sub_controller))
+        for sub_controller in controller.get_sub_controllers()
+    }
+
+
+def test_warm_start_uses_cache(connection, tmp_path):
+    cold = OdinTopController(SETTINGS, cache_dir=tmp_path)
+    assert connection.requests
+    assert (tmp_path / "127.0.0.1_8888.json").exists()
+
+    connection.requests.clear()
+    warm = OdinTopController(SETTINGS, cache_dir=tmp_path)
+    assert not connection.requests
+    assert sub_controller_attributes(warm) == sub_controller_attributes(cold)
+
+
+def test_cache_check_detects_changed_tree(connection, tmp_path, caplog):
+    OdinTopController(SETTINGS, cache_dir=tmp_path)
+    controller = OdinTopController(SETTINGS, cache_dir=tmp_path)
+
+    with caplog.at_level(logging.INFO):
+        asyncio.run(controller._check_cache())
+    assert "up to date" in caplog.text
+
+    connection.adapters["fp"]["0"]["status"]["new_parameter"] = 1
+    asyncio.run(controller._check_cache())
+    assert "differ from" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        asyncio.run(OdinTopController(SETTINGS, cache_dir=tmp_path)._check_cache())
+    assert "up to date" in caplog.text
@@ -1,10 +1,118 @@
+import inspect
 import subprocess
 import sys
 
+import pytest
+import typer
+from typer.testing import CliRunner
+
 from odin_fastcs import __version__
+from odin_fastcs.__main__ import (
+    ControllerOptions,
+    _connection_settings,
+    _controller_options,
+    asyncio,
+    controller_command,
+    ioc,
+    parse_server,
+)
+from odin_fastcs.http_connection import HTTPConnectionSettings
 
 
 def test_cli_version():
     cmd = [sys.executable, "-m", "odin_fastcs", "--version"]
     stdout = subprocess.check_output(cmd).decode().strip().split("\n")
     assert __version__ in stdout
+
+
+# Seconds to import everything needed by --version, well above the ~0.1 s it takes
+# so that only eager imports of dependencies, at ~1 s, exceed it
+IMPORT_TIME_BUDGET = 0.5
+
+
+def test_cli_version_import_time():
+    cmd = [sys.executable, "-X", "importtime", "-m", "odin_fastcs", "--version"]
+    stderr = subprocess.run(cmd, capture_output=True, check=True).stderr.decode()
+
+    # Lines are "import time: <self us> | <cumulative us> | <indented module name>"
+    imports = [
+        line.removeprefix("import time:").split("|")
+        for line in stderr.splitlines()
+        if line.startswith("import time:") and "[us]" not in line
+    ]
+    modules = {name.strip() for _, _, name in imports}
+    assert not modules & {"aiohttp", "fastcs.backends", "numpy", "softioc"}
+
+    # Cumulative times of top level imports include all the imports they trigger
+    total = sum(int(cumulative) for _, cumulative, name in imports if name[1] != " ")
+    assert total / 1e6 < IMPORT_TIME_BUDGET
+
+
+def test_parse_server():
+    settings = HTTPConnectionSettings(pool_size=10)
+    prefix, server_settings = parse_server("ODIN1=10.0.0.1:8889", settings)
+    assert prefix == "ODIN1"
+    assert server_settings == HTTPConnectionSettings("10.0.0.1", 8889, pool_size=10)
+
+    with pytest.raises(typer.BadParameter):
+        parse_server("10.0.0.1:8889", settings)
+
+
+def test_commands_share_options():
+    ioc_parameters = dict(inspect.signature(ioc).parameters)
+    del ioc_parameters["pv_prefix"], ioc_parameters["background_gui"]
+    assert ioc_parameters == dict(inspect.signature(asyncio).parameters)
+
+    # Each option is passed to the settings or options and defaults to their default
+    default_options = ControllerOptions()
+    default_settings = HTTPConnectionSettings()
+    connection_options = inspect.signature(_connection_settings).parameters
+    for name, parameter in inspect.signature(_controller_options).parameters.items():
+        if name in connection_options:
+            assert parameter.default == getattr(default_settings, name), name
+        elif name != "server":
+            assert parameter.default == getattr(default_options, name), name
+
+
+def test_controller_command(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "odin_fastcs.__main__.get_controller_mapping",
+        lambda settings, options, servers: (settings, options, servers),
+    )
+
+    app = typer.Typer()
+
+    @app.command()
+    @controller_command
+    def command(mapping, name: str = typer.Argument()):
+        calls.append((mapping, name))
+
+    result = CliRunner().invoke(
+        app,
+        ["--batch-poll", "--aggregate", "*/a -> sum", "--read-timeout", "0", "NAME"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert calls == [
+        (
+            (
+                HTTPConnectionSettings(read_timeout=None),
+                ControllerOptions(batch_poll=True, aggregates=["*/a -> sum"]),
+                None,
+            ),
+            "NAME",
+        )
+    ]
+
+
+def test_connection_settings_disable_timeouts():
+    parameters = inspect.signature(ioc).parameters
+    settings = _connection_settings(
+        **{
+            name: parameters[name].default
+            for name in inspect.signature(_connection_settings).parameters
+        }
+        | {"read_timeout": 0, "backoff_initial": 1.0}
+    )
+    assert settings == HTTPConnectionSettings(read_timeout=None, backoff_initial=1.0)
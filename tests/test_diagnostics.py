@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import start_server
+from odin_fastcs.diagnostics import DiagnosticsController
+from odin_fastcs.errors import ErrorAggregator
+from odin_fastcs.http_connection import HTTPConnection, LatencyHistogram, adapter_of
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) == 0
+
+    for _ in range(98):
+        histogram.record(0.001)
+    histogram.record(0.1)
+    histogram.record(1)
+
+    assert 0.001 <= histogram.percentile(50) < 0.0015
+    assert 0.1 <= histogram.percentile(99) < 0.15
+    assert 1 <= histogram.percentile(100) < 1.5
+
+
+def test_adapter_of():
+    assert adapter_of("api/0.1/fp/0/status/hdf/writing") == "fp"
+    assert adapter_of("api/0.1/adapters") == "adapters"
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_published():
+    server = await start_server(delay=0.01)
+    connection = HTTPConnection(server.host, server.port)
+    connection.open()
+    errors = ErrorAggregator()
+    errors.report("Update", "api/0.1/fr/0/status/hdf/writing", ValueError("bad"))
+    controller = DiagnosticsController(connection, ["fp", "fr"], errors)
+
+    for _ in range(3):
+        await connection.get("api/0.1/fp/0/status")
+    await controller.update_diagnostics()
+
+    assert controller.request_rate.get() > 0
+    assert controller.decode_time_ms.get() > 0
+    assert controller.fp_request_rate.get() > 0  # type: ignore
+    assert controller.fp_latency_p50_ms.get() >= 10  # type: ignore
+    assert controller.fr_request_rate.get() == 0  # type: ignore
+    assert controller.errors.get() == 0
+    assert controller.fp_last_error.get() == ""  # type: ignore
+    assert controller.fr_last_error.get() == (  # type: ignore
+        "Update of api/0.1/fr/0/status/hdf/writing failed: ValueError: bad"
+    )
+
+    await connection.close()
+    await server.close()
@@ -0,0 +1,55 @@
+import logging
+
+from odin_fastcs.errors import ErrorAggregator
+
+
+def test_errors_aggregated(caplog):
+    caplog.set_level(logging.ERROR)
+    errors = ErrorAggregator()
+    for _ in range(100):
+        errors.report("Update", "api/0.1/fp/0/status/hdf/writing", ValueError("a"))
+        errors.report("Update", "api/0.1/fp/0/status/hdf/writing", TimeoutError())
+    errors.report("Write", "api/0.1/fr/0/config/hdf/frames", ValueError("b"))
+
+    # The first error of each group is logged immediately
+    assert len(caplog.records) == 3
+    assert errors.last_errors["fr"] == (
+        "Write of api/0.1/fr/0/config/hdf/frames failed: ValueError: b"
+    )
+    assert errors.last_errors["fp"].endswith("TimeoutError: ")
+
+    caplog.clear()
+    errors.flush()
+    assert len(caplog.records) == 1
+    assert "198 errors in 2 groups" in caplog.text
+    assert "99 x Update of api/0.1/fp/0/status/hdf/writing failed: ValueError" in (
+        caplog.text
+    )
+
+    caplog.clear()
+    errors.flush()
+    assert not caplog.records
+
+
+def test_errors_grouped_across_paths(caplog):
+    caplog.set_level(logging.ERROR)
+    errors = ErrorAggregator()
+    # An adapter timing out fails the updates of all of its parameters
+    for idx in range(10):
+        errors.report("Update", f"api/0.1/fp/{idx}/status/hdf/writing", TimeoutError())
+        errors.report("Update", f"api/0.1/fr/{idx}/status/frames", TimeoutError())
+    errors.report("Update", "api/0.1/fp/0/status/hdf/writing", ValueError("a"))
+
+    # One error is logged immediately for each adapter and cause
+    assert len(caplog.records) == 3
+
+    caplog.clear()
+    errors.flush()
+    assert len(caplog.records) == 1
+    assert "18 errors in 2 groups" in caplog.text
+    assert (
+        "9 x Update of api/0.1/fp/0/status/hdf/writing, "
+        "api/0.1/fp/1/status/hdf/writing, api/0.1/fp/2/status/hdf/writing "
+        "and 7 more failed: TimeoutError: "
+    ) in caplog.text
+    assert "9 x Update of api/0.1/fr/0/status/frames," in caplog.text
@@ -0,0 +1,130 @@
+import copy
+from pathlib import Path
+
+import pytest
+from fastcs.backends.epics import ioc
+from fastcs.backends.epics.gui import EpicsGUI, EpicsGUIOptions
+from fastcs.connections.ip_connection import IPConnectionSettings
+from fastcs.mapping import Mapping
+from pvi.device import Group, SignalR
+
+from conftest import DummyConnection
+from odin_fastcs import odin_controller
+from odin_fastcs.gui import create_gui, gui_fingerprint
+from odin_fastcs.odin_controller import OdinServersController, OdinTopController
+
+
+class RecordingBackend:
+    """Backend that writes a placeholder GUI and records each GUI created."""
+
+    def __init__(self) -> None:
+        self.created: list[Path] = []
+
+    def create_gui(self, options: EpicsGUIOptions) -> None:
+        options.output_path.write_text("<display/>")
+        self.created.append(options.output_path)
+
+
+def create_mapping(monkeypatch, fp_response) -> Mapping:
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+    return Mapping(OdinTopController(IPConnectionSettings("127.0.0.1", 8888)))
+
+
+def test_gui_fingerprint(monkeypatch, fp_response):
+    mapping = create_mapping(monkeypatch, copy.deepcopy(fp_response))
+    fingerprint = gui_fingerprint(mapping, "ODIN")
+
+    # Values do not change the GUI
+    fp_response["0"]["status"]["hdf"]["frames_written"] = 100
+    assert gui_fingerprint(create_mapping(monkeypatch, fp_response), "ODIN") == (
+        fingerprint
+    )
+    assert gui_fingerprint(mapping, "OTHER") != fingerprint
+
+    fp_response["0"]["status"]["hdf"]["frames_lost"] = 0
+    assert gui_fingerprint(create_mapping(monkeypatch, fp_response), "ODIN") != (
+        fingerprint
+    )
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_create_gui_skipped_if_up_to_date(
+    monkeypatch, fp_response, tmp_path, background
+):
+    mapping = create_mapping(monkeypatch, fp_response)
+    backend = RecordingBackend()
+    output_path = tmp_path / "odin.bob"
+
+    def create(prefix: str) -> None:
+        thread = create_gui(
+            backend,  # type: ignore
+            mapping,
+            prefix,
+            output_path,
+            background=background,
+        )
+        if thread is not None:
+            thread.join()
+
+    create("ODIN")
+    assert backend.created == [output_path]
+    assert (tmp_path / "odin.bob.sha256").exists()
+
+    create("ODIN")
+    assert backend.created == [output_path]
+
+    create("OTHER")
+    assert backend.created == [output_path] * 2
+
+    # A GUI without a fingerprint, e.g. from an interrupted run, is created again
+    (tmp_path / "odin.bob.sha256").unlink()
+    create("OTHER")
+    assert backend.created == [output_path] * 3
+
+
+def test_pv_names_of_servers(monkeypatch, fp_response):
+    connections = {port: DummyConnection({"fp": fp_response}) for port in (1, 2)}
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection,
+        "from_settings",
+        lambda settings: connections[settings.port],
+    )
+    mapping = Mapping(
+        OdinServersController(
+            {
+                "ODIN1": IPConnectionSettings("127.0.0.1", 1),
+                "ODIN2": IPConnectionSettings("127.0.0.1", 2),
+            }
+        )
+    )
+
+    # PV names as created by the IOC, without creating the records
+    pv_names: list[str] = []
+    for create_pv in ["_create_and_link_read_pv", "_create_and_link_write_pv"]:
+        monkeypatch.setattr(ioc, create_pv, lambda name, attr: pv_names.append(name))
+    ioc._create_and_link_attribute_pvs(mapping)
+
+    assert "ODIN1:Connected" in pv_names
+    assert "ODIN2:FP0:StatusHdfWriting" in pv_names
+    assert "ODIN2:FP0:ConfigHdfFrames_RBV" in pv_names
+    assert "ODIN1:DIAG:RequestRate" in pv_names
+    assert all(name.startswith(("ODIN1:", "ODIN2:")) for name in pv_names)
+
+    # PV names of the GUI components of the controllers of each server
+    gui = EpicsGUI(mapping, "ODIN")
+    servers = gui.extract_mapping_components(mapping.get_controller_mappings()[0])
+    assert [server.name for server in servers] == ["ODIN1", "ODIN2"]
+    odin2 = servers[1]
+    assert isinstance(odin2, Group)
+    fp0 = next(child for child in odin2.children if child.name == "FP0")
+    assert isinstance(fp0, Group)
+    assert "ODIN:ODIN2:FP0:StatusHdfWriting" in [
+        signal.read_pv
+        for group in fp0.children
+        if isinstance(group, Group)
+        for signal in group.children
+        if isinstance(signal, SignalR)
+    ]
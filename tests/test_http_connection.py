@@ -0,0 +1,164 @@
+import asyncio
+import sys
+
+import pytest
+from aiohttp import ClientError
+
+from conftest import start_server
+from odin_fastcs.http_connection import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HTTPConnection,
+    HTTPConnectionSettings,
+)
+from odin_fastcs.json_codec import StdlibJsonCodec
+
+
+@pytest.mark.asyncio
+async def test_max_in_flight():
+    server = await start_server(delay=0.01)
+    connection = HTTPConnection.from_settings(
+        HTTPConnectionSettings(server.host, server.port, max_in_flight=2)
+    )
+    connection.open()
+
+    responses = await asyncio.gather(*[connection.get("value") for _ in range(6)])
+
+    assert responses == [{"value": 1}] * 6
+    assert connection.stats.requests == 6
+    assert connection.stats.peak_in_flight == 2
+    assert connection.stats.in_flight == connection.stats.waiting == 0
+    assert connection.stats.connections_created == 2
+    assert connection.stats.connections_reused == 4
+
+    await connection.close()
+    await server.close()
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+@pytest.mark.asyncio
+async def test_iter_items(monkeypatch, fp_response, streaming):
+    if streaming:
+        pytest.importorskip("ijson")
+    else:
+        monkeypatch.setitem(sys.modules, "ijson", None)
+
+    server = await start_server(delay=0, response=fp_response)
+    connection = HTTPConnection.from_settings(
+        HTTPConnectionSettings(server.host, server.port)
+    )
+    connection.open()
+
+    items = [item async for item in connection.iter_items("fp")]
+
+    assert dict(items) == fp_response
+    assert [key for key, _ in items] == list(fp_response)
+    assert connection.stats.requests == 1
+    assert connection.stats.in_flight == 0
+    assert connection.stats.decodes == 1
+    assert connection.stats.decode_time > 0
+
+    await connection.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_optional_codecs_not_installed(monkeypatch, fp_response):
+    for module in ["orjson", "msgspec", "ijson"]:
+        monkeypatch.setitem(sys.modules, module, None)
+
+    server = await start_server(delay=0, response=fp_response)
+    connection = HTTPConnection.from_settings(
+        HTTPConnectionSettings(server.host, server.port)
+    )
+    connection.open()
+
+    assert isinstance(connection._codec, StdlibJsonCodec)
+    assert await connection.get("fp") == fp_response
+    assert dict([item async for item in connection.iter_items("fp")]) == fp_response
+    assert connection.stats.decodes == 2
+
+    await connection.close()
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_read_timeout():
+    server = await start_server(delay=1)
+    connection = HTTPConnection.from_settings(
+        HTTPConnectionSettings(server.host, server.port, read_timeout=0.01)
+    )
+    connection.open()
+
+    with pytest.raises(TimeoutError):
+        await connection.get("value")
+    assert connection.stats.timeouts == 1
+    assert connection.stats.in_flight == 0
+
+    await connection.close()
+    await server.close()
+
+
+def test_circuit_breaker_ignores_failures_of_other_requests(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("odin_fastcs.http_connection.time.monotonic", lambda: now)
+    breaker = CircuitBreaker(failure_threshold=1, backoff_initial=1.0, backoff_max=10)
+    assert breaker.record_failure()
+
+    # A request sent before the circuit opened fails
+    assert not breaker.record_failure()
+    assert not breaker.allow_request()
+    now = 1.0
+    assert breaker.allow_request()
+
+    # Requests broken by reopening the session fail while the probe is in flight
+    assert not breaker.record_failure()
+    assert not breaker.allow_request()
+
+    # Only the failed probe doubles the backoff
+    assert not breaker.record_failure(probe=True)
+    now = 2.9
+    assert not breaker.allow_request()
+    now = 3.0
+    assert breaker.allow_request()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker():
+    server = await start_server(delay=0)
+    port = server.port
+    connection = HTTPConnection.from_settings(
+        HTTPConnectionSettings(
+            server.host, port, failure_threshold=2, backoff_initial=0.05
+        )
+    )
+    connection.open()
+    assert await connection.get("value") == {"value": 1}
+
+    await server.close()
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            await connection.get("value")
+    assert not connection.connected
+    assert connection.stats.circuit_trips == 1
+
+    # Requests are rejected without being sent until the backoff has passed
+    with pytest.raises(CircuitOpenError):
+        await connection.get("value")
+    assert connection.stats.rejected == 1
+
+    # Failed probe doubles the backoff
+    await asyncio.sleep(0.05)
+    with pytest.raises(ClientError):
+        await connection.get("value")
+    with pytest.raises(CircuitOpenError):
+        await connection.get("value")
+
+    server = await start_server(delay=0, port=port)
+    await asyncio.sleep(0.1)
+    assert await connection.get("value") == {"value": 1}
+    assert connection.connected
+    assert connection.stats.circuit_trips == 1
+
+    await connection.close()
+    await server.close()
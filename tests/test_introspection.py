@@ -1,14 +1,195 @@
-import json
-from pathlib import Path
+import copy
+import time
 
-from odin_fastcs.util import create_odin_parameters
+import pytest
+from fastcs.connections.ip_connection import IPConnectionSettings
+from fastcs.mapping import Mapping
 
-HERE = Path(__file__).parent
+from conftest import DummyConnection
+from odin_fastcs import odin_controller
+from odin_fastcs.http_connection import HTTPConnectionSettings
+from odin_fastcs.odin_controller import OdinServersController, OdinTopController
+from odin_fastcs.profiles import PollingProfile
+from odin_fastcs.util import create_odin_parameters, create_parameter_trie
 
 
-def test_create_odin_parameters():
-    with (HERE / "input/dummy_fp_response.json").open() as f:
-        response = json.loads(f.read())
-
-    parameters = create_odin_parameters(response)
+def test_create_odin_parameters(fp_response):
+    parameters = create_odin_parameters(fp_response)
     assert len(parameters) == 96
+
+
+def test_parameter_trie(fp_response):
+    trie = create_parameter_trie(fp_response)
+    assert [leaf.uri for leaf in trie.leaves()] == [
+        parameter.uri for parameter in create_odin_parameters(fp_response)
+    ]
+
+    hdf = trie.find(["0", "status", "hdf"])
+    assert hdf is not None and trie.find(["0", "missing"]) is None
+    assert hdf.children["frames_written"].uri == [
+        "0",
+        "status",
+        "hdf",
+        "frames_written",
+    ]
+
+    values = {"frames_written": 10, "writing": True, "unknown": 1}
+    assert [(leaf.name, value) for leaf, value in hdf.iter_values(values)] == [
+        ("frames_written", 10),
+        ("writing", True),
+    ]
+
+
+def test_adapters_introspected_concurrently(monkeypatch, fp_response):
+    connection = DummyConnection(
+        {"fp": fp_response, "fr": fp_response, "ml": fp_response, "od_fps": {}},
+        latency=0.01,
+    )
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+
+    controller = OdinTopController(
+        IPConnectionSettings("127.0.0.1", 8888), introspection_concurrency=2
+    )
+
+    assert connection.max_in_flight == 2
+    assert sorted(controller.startup_times) == ["fp", "fr", "ml"]
+    assert [c.path for c in controller.get_sub_controllers()] == [
+        ["FP"],
+        ["FP0"],
+        ["FR"],
+        ["FR0"],
+        ["ML"],
+        ["ML0"],
+        ["DIAG"],
+    ]
+
+
+def test_indexed_values_ignored(monkeypatch, fp_response):
+    # Only subtrees under indices are process trees and other indexed values are
+    # not parameters of the adapter
+    fp_response["1"] = 1
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+
+    controller = OdinTopController(IPConnectionSettings("127.0.0.1", 8888))
+
+    fp = controller.get_sub_controllers()[0]
+    assert [c.path for c in controller.get_sub_controllers()] == [
+        ["FP"],
+        ["FP0"],
+        ["DIAG"],
+    ]
+    assert isinstance(fp, odin_controller.OdinController)
+    assert "api/0.1/fp/1" not in fp.get_poll_periods()
+
+
+@pytest.mark.parametrize(
+    "options, attributes",
+    [
+        ({}, ["connected"]),
+        (
+            {
+                "settings": HTTPConnectionSettings(
+                    "127.0.0.1", 8888, failure_threshold=0
+                )
+            },
+            [],
+        ),
+        (
+            {"scheduled_polling": True},
+            ["connected", "missed_poll_deadlines", "queued_polls"],
+        ),
+        ({"max_update_period": 1.0}, ["connected", "slowed_parameters"]),
+        (
+            {"polling_profiles": [PollingProfile("idle", update_period=5.0)]},
+            ["connected", "polling_profile"],
+        ),
+        (
+            {"idle_period": 5.0},
+            ["connected", "demand_parameters", "demanded_parameters"],
+        ),
+    ],
+)
+def test_mode_attributes_created_if_enabled(
+    monkeypatch, fp_response, options, attributes
+):
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+
+    controller = OdinTopController(
+        **{"settings": IPConnectionSettings("127.0.0.1", 8888), **options}
+    )
+
+    top_mapping = Mapping(controller).get_controller_mappings()[0]
+    assert top_mapping.controller is controller
+    assert sorted(top_mapping.attributes) == sorted(
+        [
+            "failed_updates",
+            "published_updates",
+            "suppressed_updates",
+        ]
+        + attributes
+    )
+
+
+def test_template_indices(monkeypatch, fp_response, caplog):
+    fp_response["1"] = copy.deepcopy(fp_response["0"])
+    fp_response["1"]["status"]["hdf"]["rank"] = 1
+    fp_response["2"] = copy.deepcopy(fp_response["0"])
+    fp_response["2"]["status"]["hdf"]["extra"] = 0
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+
+    controller = OdinTopController(
+        IPConnectionSettings("127.0.0.1", 8888), template_indices=True
+    )
+
+    _, fp0, fp1, fp2 = [
+        c for c in controller.get_sub_controllers() if c.path[-1].startswith("FP")
+    ]
+    assert fp1._parameters is fp0._parameters
+    assert fp2._parameters is not fp0._parameters
+    assert hasattr(fp2, "status_hdf_extra") and not hasattr(fp1, "status_hdf_extra")
+    assert "Parameter tree of fp/2 differs from fp/0" in caplog.text
+
+    # Attributes are not shared, only the parameters they were created from
+    assert fp1.status_hdf_rank is not fp0.status_hdf_rank  # type: ignore
+
+
+def test_servers_introspected_concurrently(monkeypatch, fp_response):
+    connections = {
+        port: DummyConnection({"fp": fp_response}, latency=0.1) for port in (1, 2)
+    }
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection,
+        "from_settings",
+        lambda settings: connections[settings.port],
+    )
+
+    start = time.monotonic()
+    controller = OdinServersController(
+        {
+            "ODIN1": IPConnectionSettings("127.0.0.1", 1),
+            "ODIN2": IPConnectionSettings("127.0.0.1", 2),
+        }
+    )
+
+    # Each server takes 0.2 s to introspect with two requests
+    assert time.monotonic() - start < 0.35
+    assert [server.path for server in controller.get_sub_controllers()] == [
+        ["ODIN1"],
+        ["ODIN2"],
+    ]
+    assert [c.path for c in controller.servers["ODIN2"].get_sub_controllers()] == [
+        ["ODIN2", "FP"],
+        ["ODIN2", "FP0"],
+        ["ODIN2", "DIAG"],
+    ]
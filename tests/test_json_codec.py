@@ -0,0 +1,34 @@
+import json
+import sys
+
+import pytest
+
+from odin_fastcs.json_codec import JSON_CODECS, StdlibJsonCodec, get_json_codec
+
+
+@pytest.mark.parametrize("name", JSON_CODECS)
+def test_codec_round_trip(name, fp_response):
+    try:
+        codec = get_json_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+    assert codec.loads(json.dumps(fp_response).encode()) == fp_response
+    assert json.loads(codec.dumps(fp_response)) == fp_response
+
+
+def test_default_codec_falls_back_to_stdlib(monkeypatch):
+    # Importing a module that is None in sys.modules raises ImportError, as if the
+    # optional codec libraries are not installed
+    for module in ["orjson", "msgspec"]:
+        monkeypatch.setitem(sys.modules, module, None)
+
+    assert isinstance(get_json_codec(), StdlibJsonCodec)
+    for name in ["orjson", "msgspec"]:
+        with pytest.raises(ImportError):
+            get_json_codec(name)
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        get_json_codec("yaml")
@@ -0,0 +1,336 @@
+import asyncio
+import logging
+from typing import Any
+
+import pytest
+from fastcs.attributes import AttrR
+from fastcs.connections.ip_connection import IPConnectionSettings
+
+from conftest import DummyConnection
+from odin_fastcs import odin_controller
+from odin_fastcs.http_connection import CircuitOpenError
+from odin_fastcs.odin_controller import OdinController, OdinTopController
+
+API_PREFIX = "api/0.1/fp"
+
+
+async def create_controllers(
+    connection: DummyConnection,
+    response: dict[str, Any],
+    batch: bool,
+    heartbeat_period: float | None = None,
+    write_window: float | None = None,
+    max_update_period: float | None = None,
+    idle_period: float | None = None,
+) -> list[OdinController]:
+    root_tree = {k: v for k, v in response.items() if not k.isdigit()}
+    controllers = [
+        OdinController(
+            connection,  # type: ignore
+            root_tree,
+            API_PREFIX,
+            ["FP"],
+            batch_depth=1 if batch else None,
+            heartbeat_period=heartbeat_period,
+            write_window=write_window,
+            max_update_period=max_update_period,
+            idle_period=idle_period,
+        )
+    ]
+    for idx, tree in response.items():
+        if idx.isdigit():
+            controllers.append(
+                OdinController(
+                    connection,  # type: ignore
+                    tree,
+                    f"{API_PREFIX}/{idx}",
+                    [f"FP{idx}"],
+                    batch_depth=0 if batch else None,
+                    heartbeat_period=heartbeat_period,
+                    write_window=write_window,
+                    max_update_period=max_update_period,
+                    idle_period=idle_period,
+                )
+            )
+
+    for controller in controllers:
+        await controller._create_parameter_tree()
+
+    return controllers
+
+
+async def poll(controllers: list[OdinController]) -> dict[str, Any]:
+    values = {}
+    for controller in controllers:
+        for name, attr in vars(controller).items():
+            if isinstance(attr, AttrR) and attr.updater is not None:
+                await attr.updater.update(controller, attr)  # type: ignore
+                values[f"{':'.join(controller.path)}.{name}"] = attr.get()
+
+    return values
+
+
+@pytest.mark.asyncio
+async def test_batched_poll_matches_individual_poll(fp_response):
+    connection = DummyConnection({"fp": fp_response})
+    individual = await poll(await create_controllers(connection, fp_response, False))
+    individual_requests = len(connection.requests)
+
+    connection.requests.clear()
+    batched = await poll(await create_controllers(connection, fp_response, True))
+
+    assert batched == individual
+    assert individual_requests == len(individual)
+    # One request per top level node of the adapter and one for the process subtree
+    assert sorted(connection.requests) == [
+        f"{API_PREFIX}/0",
+        f"{API_PREFIX}/api",
+        f"{API_PREFIX}/count",
+        f"{API_PREFIX}/endpoints",
+        f"{API_PREFIX}/module",
+        f"{API_PREFIX}/update_interval",
+    ]
+
+
+def published(controllers: list[OdinController]) -> tuple[int, int]:
+    return (
+        sum(c.update_counters.published for c in controllers),
+        sum(c.update_counters.suppressed for c in controllers),
+    )
+
+
+@pytest.mark.asyncio
+async def test_unchanged_values_suppressed(fp_response):
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(connection, fp_response, False)
+    attributes = len(await poll(controllers))
+    assert published(controllers) == (attributes, 0)
+
+    fp_response["0"]["status"]["hdf"]["frames_written"] = 10
+    values = await poll(controllers)
+    assert values["FP0.status_hdf_frames_written"] == 10
+    assert published(controllers) == (attributes + 1, attributes - 1)
+
+
+@pytest.mark.asyncio
+async def test_missing_parameters_errors_grouped(fp_response, caplog):
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(connection, fp_response, False)
+    hdf = fp_response["0"]["status"]["hdf"]
+    del hdf["frames_written"], hdf["frames_processed"]
+
+    caplog.set_level(logging.ERROR)
+    for _ in range(3):
+        await poll(controllers)
+
+    # The errors of every missing parameter are in one group
+    assert len(caplog.records) == 1
+    assert (
+        caplog.records[0]
+        .getMessage()
+        .endswith("ValueError: Parameter not found in response")
+    )
+
+    caplog.clear()
+    controllers[1].error_aggregator.flush()
+    assert "5 x Update of api/0.1/fp/0/status/hdf/frames_processed, " in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_republishes_unchanged_values(fp_response):
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(
+        connection, fp_response, False, heartbeat_period=0
+    )
+    attributes = len(await poll(controllers))
+    await poll(controllers)
+
+    assert published(controllers) == (2 * attributes, 0)
+
+
+@pytest.mark.asyncio
+async def test_put_response_sets_attributes(fp_response):
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(connection, fp_response, False)
+    await poll(controllers)
+    connection.requests.clear()
+
+    controller = controllers[1]
+    attr = controller.config_hdf_frames
+    await attr.sender.put(controller, attr, 100)
+
+    assert connection.requests == [f"{API_PREFIX}/0/config/hdf/frames"]
+    assert attr.get() == 100
+    assert fp_response["0"]["config"]["hdf"]["frames"] == 100
+
+
+@pytest.mark.asyncio
+async def test_writes_merged(fp_response, caplog):
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(
+        connection, fp_response, False, write_window=0.01
+    )
+    controller = controllers[1]
+    writes = {
+        controller.config_hdf_frames: 100,
+        controller.config_hdf_file_path: "/data",
+        controller.config_hdf_file_prefix: "test",
+    }
+
+    await asyncio.gather(
+        *[attr.sender.put(controller, attr, value) for attr, value in writes.items()]
+    )
+
+    assert connection.requests == [f"{API_PREFIX}/0/config/hdf"]
+    assert fp_response["0"]["config"]["hdf"]["frames"] == 100
+    assert fp_response["0"]["config"]["hdf"]["file"]["path"] == "/data"
+    assert fp_response["0"]["config"]["hdf"]["file"]["prefix"] == "test"
+    assert [attr.get() for attr in writes] == list(writes.values())
+
+    # If the merged write fails each write is sent individually
+    connection.requests.clear()
+    connection.errors.add(f"{API_PREFIX}/0/config/hdf/file/path")
+    await asyncio.gather(*[attr.sender.put(controller, attr, 1) for attr in writes])
+
+    assert connection.requests == [
+        f"{API_PREFIX}/0/config/hdf",
+        f"{API_PREFIX}/0/config/hdf/frames",
+        f"{API_PREFIX}/0/config/hdf/file/path",
+        f"{API_PREFIX}/0/config/hdf/file/prefix",
+    ]
+    assert fp_response["0"]["config"]["hdf"]["file"]["path"] == "/data"
+    assert "0/config/hdf/file/path" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_adaptive_polling(fp_response, monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("odin_fastcs.odin_controller.time.monotonic", lambda: now)
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(
+        connection, fp_response, False, max_update_period=0.8
+    )
+    controller = controllers[1]
+
+    async def scan(ticks: int):
+        nonlocal now
+        for _ in range(ticks):
+            await poll(controllers)
+            now += 0.2
+
+    # Unchanged parameters slow down after 5 polls at each period, up to the ceiling
+    await scan(30)
+    assert set(controller.get_poll_periods().values()) == {0.8}
+    assert connection.requests.count(f"{API_PREFIX}/0/status/hdf/writing") == 14
+    await controller.update_poll_periods()
+    assert controller.poll_period_min.get() == 0.8
+    assert controller.poll_period_max.get() == 0.8
+    parameter_count = len(controller.get_poll_periods())
+    assert controller.poll_periods.get() == f"0.8 s: {parameter_count}"
+
+    # A change resets the parameters next to it
+    fp_response["0"]["status"]["hdf"]["frames_written"] = 10
+    await scan(4)
+    periods = controller.get_poll_periods()
+    assert periods[f"{API_PREFIX}/0/status/hdf/frames_written"] == 0.2
+    assert periods[f"{API_PREFIX}/0/status/hdf/writing"] == 0.2
+    assert periods[f"{API_PREFIX}/0/config/hdf/frames"] == 0.8
+    await controller.update_poll_periods()
+    assert controller.poll_period_min.get() == 0.2
+    assert controller.poll_period_max.get() == 0.8
+    assert controller.poll_periods.get().startswith("0.2 s: ")
+
+    # A write resets the parameter written
+    attr = controller.config_hdf_frames
+    await attr.sender.put(controller, attr, 100)
+    assert controller.get_poll_periods()[f"{API_PREFIX}/0/config/hdf/frames"] == 0.2
+
+
+@pytest.mark.asyncio
+async def test_lazy_polling(fp_response, monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("odin_fastcs.odin_controller.time.monotonic", lambda: now)
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(
+        connection, fp_response, False, idle_period=2.0
+    )
+    controller = controllers[1]
+    writing = f"{API_PREFIX}/0/status/hdf/writing"
+    frames = f"{API_PREFIX}/0/config/hdf/frames"
+
+    async def scan(ticks: int):
+        nonlocal now
+        for _ in range(ticks):
+            await poll(controllers)
+            now += 0.2
+
+    # Parameters without demand are polled at the idle period
+    await scan(20)
+    assert connection.requests.count(writing) == 2
+    assert controller.count_demanded() == 0
+
+    # Demanded parameters are polled at the update period until the demand expires
+    assert controller.demand([f"{API_PREFIX}/*/status/hdf/*"], duration=2.0) > 0
+    connection.requests.clear()
+    await scan(20)
+    assert connection.requests.count(writing) == 10 + 1
+
+    # A write demands the parameter written
+    attr = controller.config_hdf_frames
+    await attr.sender.put(controller, attr, 100)
+    assert controller.get_poll_periods()[frames] == 0.2
+    assert controller.get_poll_periods()[writing] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_server_down_not_logged_and_values_republished(fp_response, caplog):
+    connection = DummyConnection({"fp": fp_response})
+    controllers = await create_controllers(connection, fp_response, False)
+    attributes = len(await poll(controllers))
+
+    async def server_down(uri: str, headers: dict | None = None):
+        raise CircuitOpenError("Server is down")
+
+    connection.get = server_down  # type: ignore
+    await poll(controllers)
+    assert published(controllers) == (attributes, 0)
+    assert sum(c.update_counters.failed for c in controllers) == 0
+    assert "Update loop failed" not in caplog.text
+
+    del connection.get
+    for controller in controllers:
+        controller.mark_stale()
+    await poll(controllers)
+    assert published(controllers) == (2 * attributes, 0)
+
+
+def test_reconnect_marks_attributes_stale(monkeypatch, fp_response):
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+    controller = OdinTopController(IPConnectionSettings("127.0.0.1", 8888))
+    stale: list[list[str]] = []
+    monkeypatch.setattr(
+        OdinController, "mark_stale", lambda self: stale.append(self.path)
+    )
+
+    # A healthy connection is not a reconnect
+    asyncio.run(controller.update_statistics())
+    assert controller.connected.get()
+    assert not stale
+
+    connection.connected = False
+    asyncio.run(controller.update_statistics())
+    assert not controller.connected.get()
+    assert not stale
+
+    connection.connected = True
+    asyncio.run(controller.update_statistics())
+    assert stale == [["FP"], ["FP0"]]
+
+    # A trip and recovery between scans is also a reconnect
+    stale.clear()
+    connection.stats.circuit_trips += 1
+    asyncio.run(controller.update_statistics())
+    assert stale == [["FP"], ["FP0"]]
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from fastcs.attributes import AttrR
+from fastcs.connections.ip_connection import IPConnectionSettings
+
+from conftest import DummyConnection
+from odin_fastcs import odin_controller
+from odin_fastcs.odin_controller import OdinTopController, ParamTreeHandler
+from odin_fastcs.profiles import (
+    PollingProfile,
+    load_polling_profiles,
+    select_polling_profile,
+)
+
+PROFILES = """
+[profiles.acquiring]
+when = { "status/hdf/writing" = true }
+update_period = 1.0
+periods = { "status/hdf/*" = 0.2 }
+
+[profiles.idle]
+update_period = 5.0
+"""
+
+
+def test_load_polling_profiles(tmp_path):
+    path = tmp_path / "profiles.toml"
+    path.write_text(PROFILES)
+
+    acquiring, idle = load_polling_profiles(path)
+
+    assert acquiring == PollingProfile(
+        "acquiring",
+        update_period=1.0,
+        periods={"status/hdf/*": 0.2},
+        when={"status/hdf/writing": True},
+    )
+    assert acquiring.period("status/hdf/frames_written") == 0.2
+    assert acquiring.period("config/hdf/frames") == 1.0
+    assert idle == PollingProfile("idle", update_period=5.0)
+
+    writing = [("status/hdf/writing", False), ("status/hdf/writing", True)]
+    assert select_polling_profile([acquiring, idle], writing) is acquiring
+    assert select_polling_profile([acquiring, idle], writing[:1]) is idle
+    assert select_polling_profile([acquiring], writing[:1]) is None
+
+
+def test_invalid_polling_profiles(tmp_path):
+    path = tmp_path / "profiles.toml"
+    path.write_text("[profiles.idle]\nperiod = 5.0\n")
+    with pytest.raises(ValueError, match="Invalid polling profile"):
+        load_polling_profiles(path)
+
+    path.write_text("update_period = 5.0\n")
+    with pytest.raises(ValueError, match="No \\[profiles\\]"):
+        load_polling_profiles(path)
+
+
+def test_profile_switched_by_watched_parameter(monkeypatch, fp_response, tmp_path):
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+    path = tmp_path / "profiles.toml"
+    path.write_text(PROFILES)
+
+    controller = OdinTopController(
+        IPConnectionSettings("127.0.0.1", 8888),
+        polling_profiles=load_polling_profiles(path),
+    )
+    fp0 = controller.get_sub_controllers()[1]
+    assert isinstance(fp0, odin_controller.OdinController)
+
+    async def scan(writing: bool):
+        await fp0.status_hdf_writing.set(writing)
+        await controller.update_polling_profile()
+        return controller.polling_profile.get(), fp0.get_poll_periods()
+
+    profile, periods = asyncio.run(scan(False))
+    assert profile == "idle"
+    assert periods.pop("api/0.1/fp/0/status/hdf/writing") == 0.2
+    assert set(periods.values()) == {5.0}
+
+    profile, periods = asyncio.run(scan(True))
+    assert profile == "acquiring"
+    assert periods["api/0.1/fp/0/status/hdf/frames_written"] == 0.2
+    assert periods["api/0.1/fp/0/config/hdf/frames"] == 1.0
+
+
+def test_watched_parameters_polled_at_update_period(monkeypatch, fp_response, tmp_path):
+    now = 0.0
+    monkeypatch.setattr("odin_fastcs.odin_controller.time.monotonic", lambda: now)
+    connection = DummyConnection({"fp": fp_response})
+    monkeypatch.setattr(
+        odin_controller.HTTPConnection, "from_settings", lambda settings: connection
+    )
+    path = tmp_path / "profiles.toml"
+    path.write_text(PROFILES)
+
+    controller = OdinTopController(
+        IPConnectionSettings("127.0.0.1", 8888),
+        max_update_period=5.0,
+        polling_profiles=load_polling_profiles(path),
+    )
+    fp0 = controller.get_sub_controllers()[1]
+    assert isinstance(fp0, odin_controller.OdinController)
+
+    async def scan(ticks: int):
+        nonlocal now
+        for _ in range(ticks):
+            for sub_controller in controller.get_sub_controllers():
+                for attr in vars(sub_controller).values():
+                    if isinstance(attr, AttrR) and attr.updater is not None:
+                        await attr.updater.update(sub_controller, attr)
+            await controller.update_polling_profile()
+            now += ParamTreeHandler.update_period
+
+    asyncio.run(scan(50))
+    assert controller.polling_profile.get() == "idle"
+    periods = fp0.get_poll_periods()
+    assert periods["api/0.1/fp/0/status/hdf/writing"] == 0.2
+    assert periods["api/0.1/fp/0/status/hdf/frames_written"] == 5.0
+
+    # The acquiring profile is applied within one update period of writing starting
+    fp_response["0"]["status"]["hdf"]["writing"] = True
+    asyncio.run(scan(1))
+    assert controller.polling_profile.get() == "acquiring"
+    periods = fp0.get_poll_periods()
+    assert periods["api/0.1/fp/0/status/hdf/frames_written"] == 0.2
@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from odin_fastcs.scheduler import PollScheduler
+
+
+def recorder(started: list, key: str):
+    async def poll():
+        started.append(key)
+
+    return poll
+
+
+@pytest.mark.asyncio
+async def test_polls_started_in_priority_order():
+    scheduler = PollScheduler()
+    started: list[str] = []
+    for key, priority in [("config", 0), ("status", 1), ("other", 0)]:
+        scheduler.submit(key, recorder(started, key), period=0.1, priority=priority)
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.15)
+    task.cancel()
+
+    assert started == ["status", "config", "other"]
+    assert scheduler.stats.polls == 3
+    assert scheduler.stats.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_polls_spread_within_budget():
+    scheduler = PollScheduler(budget=20)
+    for key in range(10):
+        scheduler.submit(key, recorder([], str(key)), period=0.1)
+
+    # 10 polls every 0.1s would be 100/s, so limited to the budget of 20/s
+    assert scheduler.interval() == pytest.approx(0.05)
+    assert PollScheduler().interval() == 0
+
+
+def test_duplicate_submit_ignored_and_missed_deadlines_counted(monkeypatch):
+    now = 0.0
+    monkeypatch.setattr("odin_fastcs.scheduler.time.monotonic", lambda: now)
+    scheduler = PollScheduler()
+    poll = recorder([], "a")
+
+    scheduler.submit("a", poll, period=1)
+    now = 0.1
+    scheduler.submit("a", poll, period=1)
+    assert scheduler.stats.missed_deadlines == 0
+    assert scheduler.stats.queued == 1
+
+    now = 1.0
+    scheduler.submit("a", poll, period=1)
+    assert scheduler.stats.missed_deadlines == 1
+    assert scheduler.stats.queued == 1
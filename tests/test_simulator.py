@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from odin_fastcs.http_connection import HTTPConnection, HTTPConnectionSettings
+from odin_fastcs.odin_controller import REQUEST_METADATA_HEADER, OdinTopController
+from odin_fastcs.simulator import OdinSimulator, SimulatorSettings, create_adapter_tree
+from odin_fastcs.util import create_odin_parameters
+from odin_fastcs.workers import PollWorkerPool
+
+
+def test_create_adapter_tree(fp_response):
+    assert create_adapter_tree(1) == fp_response
+
+    tree = create_adapter_tree(4, extra_parameters=10)
+    assert tree["count"]["value"] == 4
+    assert [e["port"]["value"] for e in tree["endpoints"]] == [
+        10004,
+        10014,
+        10024,
+        10034,
+    ]
+    assert len(create_odin_parameters(tree)) == 4 + 4 * (2 + 90 + 10)
+
+
+@pytest.mark.asyncio
+async def test_simulator_requests():
+    simulator = OdinSimulator(SimulatorSettings(processes=2, adapters=("fp",)))
+    port = await simulator.start(port=0)
+    connection = HTTPConnection("127.0.0.1", port)
+    connection.open()
+
+    assert await connection.get("api/0.1/adapters") == {"adapters": ["fp"]}
+    tree = await connection.get("api/0.1/fp", headers=REQUEST_METADATA_HEADER)
+    assert tree == simulator.trees["fp"]
+    assert await connection.get("api/0.1/fp/1/status/hdf/rank") == {"rank": 1}
+
+    response = await connection.put("api/0.1/fp/1/config/hdf/file", {"path": "/data"})
+    assert response == {"file": simulator.get_value("fp", "1/config/hdf/file")}
+    assert simulator.get_value("fp", "1/config/hdf/file/path") == "/data"
+
+    response = await connection.put("api/0.1/fp/1/status/hdf/rank", 0)
+    assert response == {"error": "Parameter 1/status/hdf/rank is not writeable"}
+    response = await connection.get("api/0.1/fp/1/status/missing")
+    assert response == {"error": "Invalid path: /api/0.1/fp/1/status/missing"}
+
+    simulator.settings.error_rate = 1
+    assert await connection.get("api/0.1/adapters") == {"error": "Simulated error"}
+
+    await connection.close()
+    await simulator.stop()
+
+
+@pytest.fixture
+def simulator_port() -> Iterator[tuple[OdinSimulator, int]]:
+    simulator = OdinSimulator(SimulatorSettings(processes=4))
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    port = asyncio.run_coroutine_threadsafe(simulator.start(port=0), loop).result()
+
+    yield simulator, port
+
+    asyncio.run_coroutine_threadsafe(simulator.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_controllers_created_from_simulator(simulator_port):
+    _, port = simulator_port
+    controller = OdinTopController(HTTPConnectionSettings("127.0.0.1", port))
+
+    paths = [c.path for c in controller.get_sub_controllers()]
+    assert paths[:5] == [["FP"], ["FP0"], ["FP1"], ["FP2"], ["FP3"]]
+    assert len(paths) == 3 * 5 + 1
+
+
+def test_poll_workers(simulator_port):
+    simulator, port = simulator_port
+    controller = OdinTopController(
+        HTTPConnectionSettings("127.0.0.1", port), poll_workers=2
+    )
+    fp3 = controller.get_sub_controllers()[4]
+    assert fp3.path == ["FP3"]
+
+    async def poll() -> None:
+        await controller.connect()
+        try:
+            simulator.set_value("fp", "3/status/hdf/frames_written", 5)
+            async with asyncio.timeout(10):
+                while fp3.status_hdf_frames_written.get() != 5:  # type: ignore
+                    await asyncio.sleep(0.05)
+
+            # Writes are still sent from this process
+            await fp3.write_parameter("api/0.1/fp/3/config/hdf/frames", 10)  # type: ignore
+            assert simulator.get_value("fp", "3/config/hdf/frames") == 10
+        finally:
+            await controller.close()
+
+    asyncio.run(poll())
+
+
+def test_poll_worker_restarted(simulator_port, monkeypatch):
+    simulator, port = simulator_port
+    monkeypatch.setattr(PollWorkerPool, "RESTART_DELAY", 0.1)
+    controller = OdinTopController(
+        HTTPConnectionSettings("127.0.0.1", port), poll_workers=1
+    )
+    fp3 = controller.get_sub_controllers()[4]
+    pool = controller._poll_worker_pool
+    assert isinstance(pool, PollWorkerPool)
+
+    async def wait_for(value: int) -> None:
+        simulator.set_value("fp", "3/status/hdf/frames_written", value)
+        async with asyncio.timeout(10):
+            while fp3.status_hdf_frames_written.get() != value:  # type: ignore
+                await asyncio.sleep(0.05)
+
+    async def poll() -> None:
+        await controller.connect()
+        try:
+            await wait_for(5)
+            for process, _ in pool._workers.values():
+                process.kill()
+
+            # The worker is restarted and polls its subtrees again
+            await wait_for(6)
+            assert pool.restarts == 1
+            assert "Poller worker stopped" in fp3.error_aggregator.last_errors["fp"]  # type: ignore
+        finally:
+            await controller.close()
+
+        assert not pool._workers
+
+    asyncio.run(poll())